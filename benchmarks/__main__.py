@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import sys
+import argparse
+
+from typing import Optional
+
+from benchmarks.generators import SIZES
+from benchmarks.runner import run, compare, load, dump
+
+
+def make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='benchmarks', description='Thymus performance benchmarks.')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub_parsers.add_parser('run', help='run the benchmarks and save the results as JSON')
+    run_parser.add_argument(
+        '--sizes',
+        default='1k,100k',
+        help=f'comma-separated sizes of the generated configs: {", ".join(SIZES)} (default: 1k,100k)',
+    )
+    run_parser.add_argument('--bench', default='', help='regular expression to select the benchmarks by name')
+    run_parser.add_argument('--repeat', type=int, default=3, help='number of samples for every benchmark')
+    run_parser.add_argument('--output', default='', help='path to a JSON file, stdout by default')
+
+    compare_parser = sub_parsers.add_parser('compare', help='compare the results of two runs')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    compare_parser.add_argument(
+        '--threshold', type=float, default=1.2, help='ratio of medians to report a regression (default: 1.2)'
+    )
+
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = make_parser().parse_args(argv)
+
+    if args.command == 'compare':
+        return 1 if compare(load(args.before), load(args.after), threshold=args.threshold) else 0
+
+    sizes = tuple(size.strip().lower() for size in args.sizes.split(',') if size.strip())
+
+    if unknown := [size for size in sizes if size not in SIZES]:
+        print(f'Unknown sizes: {", ".join(unknown)}.', file=sys.stderr)
+        return 1
+
+    if args.repeat < 1:
+        print('Number of samples must be positive.', file=sys.stderr)
+        return 1
+
+    results = run(sizes=sizes, pattern=args.bench, repeat=args.repeat)
+
+    if args.output:
+        dump(results, args.output)
+    else:
+        import json
+
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import os
+import tempfile
+
+from collections import deque
+from functools import lru_cache
+
+from thymus.contexts import Context
+from thymus.responses import Response
+from thymus.batch import load_platform, build_context
+
+from benchmarks.generators import SIZES, get_config
+
+
+PLATFORMS = ('junos', 'ios')
+
+# Every command is a template, mods are substituted with the aliases of a context.
+SHOW_COMMANDS = {
+    'junos': {
+        'none': 'show interfaces',
+        'filter': 'show interfaces | {filter} unit',
+        'wildcard': 'show interfaces | {wildcard} ge-0/0/1.*',
+        'save': 'show interfaces | {save} {path}',
+        'count': 'show | {count}',
+        'diff': 'show | {diff} {peer}',
+        'inactive': 'show | {inactive}',
+        'stubs': 'show system | {stubs}',
+        'sections': 'show interfaces | {sections}',
+        'contains': 'show | {contains} description',
+        'reveal': 'show | {reveal}',
+    },
+    'ios': {
+        'none': 'show interface',
+        'filter': 'show | {filter} description',
+        'wildcard': 'show | {wildcard} GigabitEthernet0/1.*',
+        'save': 'show interface | {save} {path}',
+        'count': 'show | {count}',
+        'diff': 'show | {diff} {peer}',
+        'stubs': 'show router bgp 65000 | {stubs}',
+        'sections': 'show | {sections}',
+        'contains': 'show | {contains} description',
+    },
+}
+
+COMPLETIONS = {
+    'junos': (
+        'show interfaces ge-0/0/1',
+        'show policy-options prefix-list PL-1',
+        'top show protocols bgp group ext n',
+    ),
+    'ios': ('show interface GigabitEthernet0/1', 'show ip access-list extended ACL-1', 'top show router bgp 65000 n'),
+}
+
+
+@lru_cache(maxsize=None)
+def get_context(platform: str, size: str, variant: int = 0) -> Context:
+    """Function builds a context once per process, commands that do not move the cursor can share it."""
+    context = build_context(load_platform(platform), get_config(platform, size, variant), context_id=variant)
+    context.name = f'b{platform}{size}{variant}'
+    return context
+
+
+def consume(response: Response) -> None:
+    if response.status == 'error':
+        raise RuntimeError(f'Benchmark command failed: {list(response.value)}')
+
+    deque(response.value, maxlen=0)
+
+
+class Build:
+    params = (PLATFORMS, tuple(SIZES))
+    param_names = ('platform', 'size')
+
+    def setup(self, platform: str, size: str) -> None:
+        self.platform_settings = load_platform(platform)
+        self.content = get_config(platform, size)
+
+    def time_build(self, platform: str, size: str) -> None:
+        context = build_context(self.platform_settings, self.content)
+        context.release()
+
+
+class Show:
+    params = (PLATFORMS, tuple(SIZES), tuple(SHOW_COMMANDS['junos']))
+    param_names = ('platform', 'size', 'mod')
+
+    def setup(self, platform: str, size: str, mod: str) -> None:
+        if mod not in SHOW_COMMANDS[platform]:
+            raise NotImplementedError(f'There is no "{mod}" for {platform}.')
+
+        self.context = get_context(platform, size)
+        self.folder = tempfile.mkdtemp()
+        aliases = {
+            name: getattr(self.context, f'alias_sub_command_{name}')
+            for name in SHOW_COMMANDS['junos']
+            if hasattr(self.context, f'alias_sub_command_{name}')
+        }
+        self.command = SHOW_COMMANDS[platform][mod].format(
+            **aliases,
+            path=os.path.join(self.folder, 'saved.conf'),
+            peer=get_context(platform, size, 1).name if mod == 'diff' else '',
+        )
+
+    def teardown(self, platform: str, size: str, mod: str) -> None:
+        path = os.path.join(self.folder, 'saved.conf')
+
+        if os.path.exists(path):
+            os.remove(path)
+
+        os.rmdir(self.folder)
+
+    def time_show(self, platform: str, size: str, mod: str) -> None:
+        consume(self.context.on_enter(self.command))
+
+
+class Diff:
+    params = (PLATFORMS, tuple(SIZES))
+    param_names = ('platform', 'size')
+
+    def setup(self, platform: str, size: str) -> None:
+        self.context = get_context(platform, size)
+        self.peer = get_context(platform, size, 1)
+
+    def time_mod_diff(self, platform: str, size: str) -> None:
+        deque(self.context.mod_diff([self.peer.name]), maxlen=0)
+
+
+class Completion:
+    params = (PLATFORMS, tuple(SIZES))
+    param_names = ('platform', 'size')
+
+    def setup(self, platform: str, size: str) -> None:
+        self.context = get_context(platform, size)
+        self.values = []
+
+        # The sidebar receives the input symbol by symbol.
+        for value in COMPLETIONS[platform]:
+            self.values.extend(value[:x] for x in range(len('show ') + 1, len(value) + 1))
+
+    def time_get_possible_sections(self, platform: str, size: str) -> None:
+        for value in self.values:
+            deque(self.context.get_possible_sections(value), maxlen=0)
+            self.context.get_virtual_from(value)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from collections import deque
+
+from textual.app import App
+from textual._context import active_app
+from textual.document._edit import Edit
+
+import thymus.modals  # noqa: F401, the working screen must not be the first to import
+from thymus.working_screen.editor import Editor
+
+from benchmarks.generators import SIZES, get_config
+
+
+def make_editor() -> Editor:
+    # TextArea talks to the active app even when it is not mounted.
+    active_app.set(App())
+    return Editor()
+
+
+def make_typing(count: int, line: int = 0) -> list[Edit]:
+    """Function returns edits as if a user typed `count` symbols starting from the line, 40 symbols per line."""
+    edits: list[Edit] = []
+    column = 0
+
+    for number in range(count):
+        text = '\n' if number % 40 == 39 else 'x'
+        edits.append(Edit(text, (line, column), (line, column), False))
+
+        if text == '\n':
+            line += 1
+            column = 0
+        else:
+            column += 1
+
+    return edits
+
+
+class CompressCommit:
+    params = (tuple(SIZES),)
+    param_names = ('edits',)
+
+    def setup(self, edits: str) -> None:
+        self.editor = make_editor()
+        # compress_commit merges the edits in place, so every sample gets its own ones
+        self.edits = make_typing(SIZES[edits])
+
+    def time_compress_commit(self, edits: str) -> None:
+        self.editor.compress_commit(self.edits)
+
+
+class Rollback:
+    params = (tuple(SIZES),)
+    param_names = ('size',)
+
+    def setup(self, size: str) -> None:
+        self.editor = make_editor()
+        self.content = get_config('junos', size)
+        self.editor.load_text(''.join(self.content))
+
+        for edit in make_typing(400, len(self.content) // 2):
+            self.editor.edit(edit)
+
+        self.editor.commit()
+        self.text = self.editor.text
+
+    def time_rollback(self, size: str) -> None:
+        rollback = self.editor.rollback()
+        next(rollback)
+        rollback.send([self.text])
+        deque(rollback, maxlen=0)
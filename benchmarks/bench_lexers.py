@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from collections import deque
+
+from thymus.lexers import JunosLexer, FastJunosLexer
+
+from benchmarks.generators import SIZES, get_config
+
+
+LEXERS = {
+    'regular': JunosLexer,
+    'fast': FastJunosLexer,
+}
+
+
+class JunosHighlight:
+    params = (tuple(LEXERS), tuple(SIZES))
+    param_names = ('lexer', 'size')
+
+    def setup(self, lexer: str, size: str) -> None:
+        self.lexer = LEXERS[lexer]()
+        self.text = ''.join(get_config('junos', size))
+
+    def time_get_tokens(self, lexer: str, size: str) -> None:
+        deque(self.lexer.get_tokens(self.text), maxlen=0)
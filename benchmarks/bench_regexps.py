@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import re
+
+from collections import deque
+
+from thymus.utils import get_regexp, get_spaces
+
+from benchmarks.generators import SIZES, get_config
+
+
+PATTERN = r'description|peer-as \d+'
+
+
+class RegexpLookup:
+    """The ways a mod can match a pattern against every line: the module functions of re with the raw pattern,
+    the shared cache of compiled patterns, and a pattern compiled in advance.
+    """
+
+    params = (('raw', 'cached', 'compiled'), tuple(SIZES))
+    param_names = ('lookup', 'size')
+
+    def setup(self, lookup: str, size: str) -> None:
+        self.lines = [x.strip() for x in get_config('junos', size)]
+        self.regexp = re.compile(PATTERN)
+
+    def time_search(self, lookup: str, size: str) -> None:
+        if lookup == 'raw':
+            deque(filter(lambda x: re.search(PATTERN, x), self.lines), maxlen=0)
+        elif lookup == 'cached':
+            deque(filter(get_regexp(PATTERN).search, self.lines), maxlen=0)
+        else:
+            deque(filter(self.regexp.search, self.lines), maxlen=0)
+
+
+class Spaces:
+    params = (tuple(SIZES),)
+    param_names = ('size',)
+
+    def setup(self, size: str) -> None:
+        self.lines = get_config('junos', size)
+
+    def time_get_spaces(self, size: str) -> None:
+        deque(map(get_spaces, self.lines), maxlen=0)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from collections.abc import Iterator
+
+
+SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+
+def _junos_interface(number: int, variant: int) -> Iterator[str]:
+    name = f'ge-{number // 2304}/{number // 48 % 48}/{number % 48}'
+    description = f'link-{number}' if not variant or number % 97 else f'link-{number}-changed'
+    prefix = 'inactive: ' if number % 50 == 49 else ''
+    yield f'    {prefix}{name} {{\n'
+    yield f'        description "{description}";\n'
+    yield '        unit 0 {\n'
+    yield '            family inet {\n'
+    yield f'                address 10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}/31;\n'
+    yield '            }\n'
+    yield '        }\n'
+    yield '    }\n'
+
+
+def _junos_prefix_list(number: int, variant: int) -> Iterator[str]:
+    yield f'    prefix-list PL-{number} {{\n'
+    for index in range(4):
+        yield f'        172.{number % 256}.{index}.0/24;\n'
+    if variant and number % 89 == 0:
+        yield f'        192.0.2.{number % 256}/32;\n'
+    yield '    }\n'
+
+
+def _junos_neighbor(number: int, variant: int) -> Iterator[str]:
+    peer_as = 64512 + number % 1000 + (1 if variant and number % 83 == 0 else 0)
+    yield f'            neighbor 10.255.{number // 256 % 256}.{number % 256} {{\n'
+    yield f'                description "peer-{number}";\n'
+    yield f'                peer-as {peer_as};\n'
+    yield '            }\n'
+
+
+def junos_config(size: int, variant: int = 0) -> list[str]:
+    """Function returns a synthetic JunOS config with about `size` lines. Sections are split between interfaces,
+    prefix lists, and BGP neighbors. A non-zero `variant` changes a small share of the values, so two configs of
+    the same size can be compared.
+    """
+    budget = max(size - 40, 30)
+    head = [
+        '## Last commit: 2024-01-01 00:00:00 UTC by bench\n',
+        'version 20.4R3;\n',
+        'system {\n',
+        f'    host-name bench-{variant};\n',
+        '    services {\n',
+        '        ssh;\n',
+        '        netconf {\n',
+        '            ssh;\n',
+        '        }\n',
+        '    }\n',
+        '    ntp {\n',
+        f'        server 10.0.0.{1 + variant};\n',
+        '    }\n',
+        '}\n',
+    ]
+    interfaces: list[str] = ['interfaces {\n']
+    policy: list[str] = ['policy-options {\n']
+    protocols: list[str] = ['protocols {\n', '    bgp {\n', '        group ext {\n', '            type external;\n']
+    number = 0
+
+    while len(interfaces) + len(policy) + len(protocols) < budget:
+        interfaces.extend(_junos_interface(number, variant))
+        if number % 2 == 0:
+            policy.extend(_junos_prefix_list(number, variant))
+        if number % 4 == 0:
+            protocols.extend(_junos_neighbor(number, variant))
+        number += 1
+
+    interfaces.append('}\n')
+    policy.append('}\n')
+    protocols.extend(['        }\n', '    }\n', '}\n'])
+
+    return head + interfaces + policy + protocols
+
+
+def _ios_interface(number: int, variant: int) -> Iterator[str]:
+    yield f'interface GigabitEthernet{number // 48}/{number % 48}\n'
+    yield f' description link-{number}{"-changed" if variant and number % 97 == 0 else ""}\n'
+    yield f' ip address 10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256} 255.255.255.254\n'
+    if number % 10 == 9:
+        yield ' shutdown\n'
+    yield '!\n'
+
+
+def _ios_acl(number: int, variant: int) -> Iterator[str]:
+    yield f'ip access-list extended ACL-{number}\n'
+    for index in range(3):
+        yield f' {10 * (index + 1)} permit ip 172.{number % 256}.{index}.0 0.0.0.255 any\n'
+    if variant and number % 89 == 0:
+        yield ' 40 deny ip any any log\n'
+    yield '!\n'
+
+
+def _ios_neighbor(number: int, variant: int) -> Iterator[str]:
+    remote_as = 64512 + number % 1000 + (1 if variant and number % 83 == 0 else 0)
+    yield f' neighbor 10.255.{number // 256 % 256}.{number % 256} remote-as {remote_as}\n'
+    yield f' neighbor 10.255.{number // 256 % 256}.{number % 256} description peer-{number}\n'
+
+
+def ios_config(size: int, variant: int = 0) -> list[str]:
+    """Function returns a synthetic IOS config with about `size` lines, see `junos_config`."""
+    budget = max(size - 20, 20)
+    head = [
+        'version 15.2\n',
+        f'hostname bench-{variant}\n',
+        '!\n',
+    ]
+    interfaces: list[str] = []
+    acls: list[str] = []
+    bgp: list[str] = ['router bgp 65000\n']
+    number = 0
+
+    while len(interfaces) + len(acls) + len(bgp) < budget:
+        interfaces.extend(_ios_interface(number, variant))
+        if number % 2 == 0:
+            acls.extend(_ios_acl(number, variant))
+        if number % 4 == 0:
+            bgp.extend(_ios_neighbor(number, variant))
+        number += 1
+
+    bgp.extend([' address-family ipv4\n', '  redistribute connected\n', ' exit-address-family\n', '!\n'])
+
+    return head + interfaces + bgp + acls + ['end\n']
+
+
+GENERATORS = {
+    'junos': junos_config,
+    'ios': ios_config,
+}
+
+
+@lru_cache(maxsize=None)
+def _cached_config(platform: str, size: str, variant: int) -> tuple[str, ...]:
+    return tuple(GENERATORS[platform](SIZES[size], variant))
+
+
+def get_config(platform: str, size: str, variant: int = 0) -> list[str]:
+    """Function returns a fresh copy of a generated config, the generation itself happens once per process."""
+    return list(_cached_config(platform, size, variant))
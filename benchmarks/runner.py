@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import os
+import re
+import sys
+import json
+import time
+import inspect
+import pkgutil
+import platform
+import importlib
+import statistics
+import subprocess
+
+from datetime import datetime, timezone
+from itertools import product
+from typing import Any, Optional, TextIO
+from collections.abc import Iterator
+
+from thymus import __version__ as app_ver
+
+from benchmarks.generators import SIZES
+
+
+class Benchmark:
+    def __init__(self, module: str, owner: type, method: str, params: tuple[str, ...]) -> None:
+        self.owner = owner
+        self.method = method
+        self.params = params
+        self.name = f'{module}.{owner.__name__}.{method}'
+        self.param_names = getattr(owner, 'param_names', ())
+
+    @property
+    def uid(self) -> str:
+        if not self.params:
+            return self.name
+
+        return f'{self.name}({", ".join(self.params)})'
+
+    def run(self, repeat: int) -> Optional[list[float]]:
+        """Method returns the durations of the samples in seconds, or None if the benchmark is not applicable.
+
+        As in asv, setup and teardown surround every sample and are not timed.
+        """
+        samples: list[float] = []
+
+        for _ in range(repeat):
+            instance = self.owner()
+
+            try:
+                if hasattr(instance, 'setup'):
+                    instance.setup(*self.params)
+            except NotImplementedError:
+                return None
+
+            try:
+                start = time.perf_counter()
+                getattr(instance, self.method)(*self.params)
+                samples.append(time.perf_counter() - start)
+            finally:
+                if hasattr(instance, 'teardown'):
+                    instance.teardown(*self.params)
+
+        return samples
+
+
+def discover() -> Iterator[Benchmark]:
+    """Function collects the `time_*` methods of the classes from the `bench_*` modules of the package.
+
+    A class can define `params` as a tuple of value lists, the benchmarks run for their cartesian product.
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+
+    for module_info in sorted(pkgutil.iter_modules([folder]), key=lambda x: x.name):
+        if not module_info.name.startswith('bench_'):
+            continue
+
+        module = importlib.import_module(f'benchmarks.{module_info.name}')
+
+        for _, owner in inspect.getmembers(module, inspect.isclass):
+            if owner.__module__ != module.__name__:
+                continue
+
+            methods = [name for name, _ in inspect.getmembers(owner, inspect.isfunction) if name.startswith('time_')]
+
+            for params in product(*getattr(owner, 'params', ())):
+                for method in methods:
+                    yield Benchmark(module_info.name, owner, method, params)
+
+
+def get_commit() -> str:
+    try:
+        result = subprocess.run(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+    return result.stdout.strip()
+
+
+def run(*, sizes: tuple[str, ...], pattern: str = '', repeat: int = 3, log: TextIO = sys.stderr) -> dict[str, Any]:
+    """Function runs the matching benchmarks and returns the results ready to be dumped as JSON."""
+    regexp = re.compile(pattern) if pattern else None
+    results: dict[str, Any] = {}
+
+    for benchmark in discover():
+        if any(param in SIZES and param not in sizes for param in benchmark.params):
+            continue
+
+        if regexp and not regexp.search(benchmark.uid):
+            continue
+
+        try:
+            samples = benchmark.run(repeat)
+        except Exception as error:
+            log.write(f'{benchmark.uid}: failed: {error}\n')
+            continue
+
+        if samples is None:
+            continue
+
+        results[benchmark.uid] = {
+            'name': benchmark.name,
+            'params': dict(zip(benchmark.param_names, benchmark.params)),
+            'samples': samples,
+            'min': min(samples),
+            'median': statistics.median(samples),
+        }
+
+        log.write(f'{benchmark.uid}: {statistics.median(samples):.6f} s\n')
+        log.flush()
+
+    return {
+        'meta': {
+            'version': app_ver,
+            'commit': get_commit(),
+            'python': platform.python_version(),
+            'machine': platform.platform(),
+            'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(old: dict[str, Any], new: dict[str, Any], *, threshold: float, out: TextIO = sys.stdout) -> int:
+    """Function prints the ratio of medians for every benchmark present in both runs. It returns the number of
+    benchmarks that became slower than the threshold allows.
+    """
+    regressions = 0
+    old_results = old['results']
+    new_results = new['results']
+
+    out.write(f'{"before":>12} {"after":>12} {"ratio":>8}  benchmark\n')
+
+    for uid in sorted(old_results.keys() & new_results.keys()):
+        before = old_results[uid]['median']
+        after = new_results[uid]['median']
+        ratio = after / before if before else float('inf')
+        mark = ''
+
+        if ratio > threshold:
+            mark = '  slower'
+            regressions += 1
+        elif ratio < 1 / threshold:
+            mark = '  faster'
+
+        out.write(f'{before:>12.6f} {after:>12.6f} {ratio:>8.2f}  {uid}{mark}\n')
+
+    for uid in sorted(old_results.keys() ^ new_results.keys()):
+        where = 'before' if uid in old_results else 'after'
+        out.write(f'{"":>12} {"":>12} {"":>8}  {uid}  only {where}\n')
+
+    return regressions
+
+
+def load(path: str) -> dict[str, Any]:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def dump(results: dict[str, Any], path: str) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
@@ -0,0 +1,18 @@
+from thymus.batch.batch import COMMANDS, load_platform, build_context, write_response, main
+from thymus.batch.audit import AuditResult, CommandResult, collect_files, audit
+from thymus.batch.drift import DriftResult, SectionDrift, drift
+
+__all__ = (
+    'COMMANDS',
+    'load_platform',
+    'build_context',
+    'write_response',
+    'main',
+    'AuditResult',
+    'CommandResult',
+    'collect_files',
+    'audit',
+    'DriftResult',
+    'SectionDrift',
+    'drift',
+)
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import os
+import csv
+import glob
+import json
+
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from collections.abc import Iterable, Iterator
+from typing import Literal, Optional, TextIO
+
+from thymus.responses import Response
+from thymus.settings import Platform
+from thymus.batch.batch import load_platform, build_context
+
+
+@dataclass
+class CommandResult:
+    command: str
+    status: Literal['error', 'success']
+    output: list[str] = field(default_factory=list)
+
+
+@dataclass
+class AuditResult:
+    path: str
+    status: Literal['error', 'success']
+    error: str = ''
+    results: list[CommandResult] = field(default_factory=list)
+
+
+# Every worker process loads a platform only once.
+_platforms: dict[str, Platform] = {}
+
+
+def collect_files(targets: Iterable[str]) -> list[str]:
+    """Function expands directories and glob patterns into a sorted list of config files. History files are skipped."""
+    result: set[str] = set()
+
+    for target in targets:
+        if os.path.isdir(target):
+            paths = [os.path.join(target, name) for name in os.listdir(target)]
+        else:
+            paths = glob.glob(target)
+
+        for path in paths:
+            if os.path.isfile(path) and not path.endswith('.history'):
+                result.add(path)
+
+    return sorted(result)
+
+
+def collect_response(response: Response) -> CommandResult:
+    result = CommandResult(command='', status=response.status)
+
+    if not response.value:
+        return result
+
+    for line in response.value:
+        if isinstance(line, Exception):
+            result.status = 'error'
+
+            if str(line):
+                result.output.append(str(line))
+        else:
+            result.output.append(str(line))
+
+    return result
+
+
+def audit_file(path: str, platform_name: str, commands: list[str], encoding: str = 'utf-8') -> AuditResult:
+    """Function builds a context for one config file and runs all the commands against it.
+
+    It is a top-level function to be picklable by the process pool.
+    """
+    if platform_name not in _platforms:
+        _platforms[platform_name] = load_platform(platform_name)
+
+    try:
+        with open(path, encoding=encoding, errors='ignore') as f:
+            content = f.readlines()
+    except OSError as error:
+        return AuditResult(path, 'error', f'File "{path}" cannot be read: {error}.')
+
+    if not content:
+        return AuditResult(path, 'error', f'File "{path}" is empty.')
+
+    try:
+        context = build_context(_platforms[platform_name], content, encoding=encoding)
+    except Exception as error:
+        return AuditResult(path, 'error', f'File "{path}" cannot be opened: {error}')
+
+    result = AuditResult(path, 'success')
+
+    try:
+        for command in commands:
+            command_result = collect_response(context.on_enter(command))
+            command_result.command = command
+
+            if command_result.status == 'error':
+                result.status = 'error'
+
+            result.results.append(command_result)
+    finally:
+        context.release()
+
+    return result
+
+
+def audit(
+    paths: list[str],
+    platform_name: str,
+    commands: list[str],
+    *,
+    encoding: str = 'utf-8',
+    workers: Optional[int] = None,
+) -> Iterator[AuditResult]:
+    """Function fans the tree construction and the commands execution out across a process pool.
+
+    Results are yielded in the order of the paths as soon as they are ready.
+    """
+    if not paths:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    # Small chunks keep all the workers busy while the IPC overhead stays low for thousands of files.
+    chunksize = max(1, min(16, len(paths) // (workers * 4)))
+    task = partial(audit_file, platform_name=platform_name, commands=commands, encoding=encoding)
+
+    if workers == 1:
+        yield from map(task, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(task, paths, chunksize=chunksize)
+
+
+def dump_json(results: Iterable[AuditResult], out: TextIO) -> int:
+    """Function streams results as a JSON array. It returns the number of failed files."""
+    failed = 0
+
+    out.write('[')
+
+    for number, result in enumerate(results):
+        if result.status == 'error':
+            failed += 1
+
+        if number:
+            out.write(',')
+
+        out.write('\n')
+        json.dump(asdict(result), out)
+
+    out.write('\n]\n')
+
+    return failed
+
+
+def dump_csv(results: Iterable[AuditResult], out: TextIO) -> int:
+    """Function streams results as CSV rows, one row per file and command. It returns the number of failed files."""
+    failed = 0
+
+    writer = csv.writer(out)
+    writer.writerow(('path', 'command', 'status', 'output'))
+
+    for result in results:
+        if result.status == 'error':
+            failed += 1
+
+        if result.error:
+            writer.writerow((result.path, '', result.status, result.error))
+
+        for command_result in result.results:
+            writer.writerow(
+                (result.path, command_result.command, command_result.status, '\n'.join(command_result.output))
+            )
+
+    return failed
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import os
+import sys
+import argparse
+
+from typing import Optional, TextIO
+
+from thymus import __version__ as app_ver
+from thymus.contexts import Context
+from thymus.responses import Response
+from thymus.settings import AppSettings, Platform, PlatformLoadFail, PLATFORMS
+
+
+COMMANDS = ('run', 'audit', 'drift')
+
+
+def load_platform(name: str) -> Platform:
+    """Function returns a platform by its short name (e.g., "junos"). If the user has saved settings for this platform
+    in the Thymus data folder, they are loaded too. Otherwise, the platform has its default settings.
+    """
+    for platform_name, platform_type in PLATFORMS:
+        if platform_name == name:
+            break
+    else:
+        raise ValueError(f'Unsupported platform: {name}.')
+
+    pre_path = os.path.expanduser(AppSettings.settings['wrapper_folder'].value)
+    path = os.path.join(pre_path, AppSettings.settings['config_folder'].value, name + '.json')
+
+    platform = platform_type(path, load=False)
+
+    if os.path.isfile(path):
+        try:
+            platform.load()
+        except PlatformLoadFail as error:
+            print(f'Cannot load platform config for "{name}": {error}. Using defaults.', file=sys.stderr)
+
+    return platform
+
+
+def build_context(
+    platform: Platform,
+    content: list[str],
+    *,
+    encoding: str = 'utf-8',
+    context_id: int = 0,
+    neighbors: Optional[list[Context]] = None,
+    saves_dir: str = '',
+) -> Context:
+    """Function creates a context for the platform, applies the platform settings to it, and builds its tree.
+
+    It raises an exception if the context cannot be built.
+    """
+    if neighbors is None:
+        neighbors = []
+
+    context = platform.link_context(  # type: ignore
+        context_id=context_id,
+        name='',
+        content=content,
+        encoding=encoding,
+        neighbors=neighbors,
+        saves_dir=saves_dir,
+    )
+
+    for k, v in platform.settings.items():
+        if not v.pass_through:
+            continue
+
+        try:
+            setattr(context, k, v.value)
+        except Exception as error:
+            print(f'Cannot configure the setting "{k}" with the value "{v.value}": {error}', file=sys.stderr)
+
+    try:
+        context.build()
+    except Exception:
+        context.release()
+        raise
+
+    neighbors.append(context)
+
+    return context
+
+
+def write_response(response: Response, out: TextIO, err: TextIO) -> bool:
+    """Function streams a response line by line to the outputs. It returns False if the response is an error or
+    an error has occurred in the middle of the stream.
+    """
+    if not response.value:
+        return response.status == 'success'
+
+    if response.status == 'error':
+        for line in response.value:
+            err.write(f'{line}\n')
+
+        return False
+
+    result = True
+
+    for line in response.value:
+        if isinstance(line, Exception):
+            if str(line):
+                err.write(f'{line}\n')
+
+            result = False
+        else:
+            out.write(f'{line}\n')
+
+    return result
+
+
+def make_parser() -> argparse.ArgumentParser:
+    platforms = [name for name, _ in PLATFORMS]
+
+    parser = argparse.ArgumentParser(prog='thymus', description=f'Thymus {app_ver} headless mode.')
+    sub_parsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub_parsers.add_parser('run', help='run context commands against a config file')
+    run_parser.add_argument('--platform', required=True, choices=platforms)
+    run_parser.add_argument('--file', required=True, help='path to a config file')
+    run_parser.add_argument('--encoding', default='utf-8')
+    run_parser.add_argument(
+        '-c',
+        '--command',
+        dest='commands',
+        action='append',
+        required=True,
+        help='context command, can be repeated (e.g., "show interfaces | count")',
+    )
+
+    audit_parser = sub_parsers.add_parser('audit', help='run context commands against many config files in parallel')
+    audit_parser.add_argument('--platform', required=True, choices=platforms)
+    audit_parser.add_argument('--encoding', default='utf-8')
+    audit_parser.add_argument(
+        '-c',
+        '--command',
+        dest='commands',
+        action='append',
+        required=True,
+        help='context command, can be repeated',
+    )
+    audit_parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    audit_parser.add_argument('--output', default='', help='path to a report file, stdout by default')
+    audit_parser.add_argument('--workers', type=int, default=0, help='number of processes, all CPUs by default')
+    audit_parser.add_argument('targets', nargs='+', help='config files, directories, or glob patterns')
+
+    drift_parser = sub_parsers.add_parser(
+        'drift', help='compare sections of many config files with a golden config in parallel'
+    )
+    drift_parser.add_argument('--platform', required=True, choices=platforms)
+    drift_parser.add_argument('--golden', required=True, help='path to a golden config file')
+    drift_parser.add_argument('--encoding', default='utf-8')
+    drift_parser.add_argument(
+        '-s',
+        '--section',
+        dest='sections',
+        action='append',
+        required=True,
+        help='path of a section to compare, can be repeated (e.g., "system", "protocols bgp")',
+    )
+    drift_parser.add_argument('--format', choices=('json', 'csv'), default='json')
+    drift_parser.add_argument('--output', default='', help='path to a report file, stdout by default')
+    drift_parser.add_argument('--workers', type=int, default=0, help='number of processes, all CPUs by default')
+    drift_parser.add_argument('targets', nargs='+', help='config files, directories, or glob patterns')
+
+    return parser
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        platform = load_platform(args.platform)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    try:
+        with open(args.file, encoding=args.encoding, errors='ignore') as f:
+            content = f.readlines()
+    except FileNotFoundError:
+        print(f'File "{args.file}" does not exist.', file=sys.stderr)
+        return 1
+    except OSError as error:
+        print(f'File "{args.file}" cannot be read: {error}.', file=sys.stderr)
+        return 1
+
+    if not content:
+        print(f'File "{args.file}" is empty.', file=sys.stderr)
+        return 1
+
+    try:
+        context = build_context(platform, content, encoding=args.encoding)
+    except Exception as error:
+        print(f'File "{args.file}" cannot be opened: {error}', file=sys.stderr)
+        return 1
+
+    code = 0
+
+    try:
+        for command in args.commands:
+            if not write_response(context.on_enter(command), sys.stdout, sys.stderr):
+                code = 1
+    finally:
+        context.release()
+
+    return code
+
+
+def run_audit(args: argparse.Namespace) -> int:
+    from thymus.batch.audit import collect_files, audit, dump_json, dump_csv
+
+    if args.workers < 0:
+        print('Number of workers cannot be negative.', file=sys.stderr)
+        return 1
+
+    if not (paths := collect_files(args.targets)):
+        print('No config files were found.', file=sys.stderr)
+        return 1
+
+    results = audit(paths, args.platform, args.commands, encoding=args.encoding, workers=args.workers)
+    dump = dump_json if args.format == 'json' else dump_csv
+
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                failed = dump(results, f)
+        else:
+            failed = dump(results, sys.stdout)
+    except (OSError, ValueError) as error:
+        print(f'Audit failed: {error}', file=sys.stderr)
+        return 1
+
+    if failed:
+        print(f'Audit completed with errors for {failed} of {len(paths)} files.', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def run_drift(args: argparse.Namespace) -> int:
+    from thymus.batch.audit import collect_files
+    from thymus.batch.drift import drift, dump_json, dump_csv
+
+    if args.workers < 0:
+        print('Number of workers cannot be negative.', file=sys.stderr)
+        return 1
+
+    if not os.path.isfile(args.golden):
+        print(f'File "{args.golden}" does not exist.', file=sys.stderr)
+        return 1
+
+    if not (paths := collect_files(args.targets)):
+        print('No config files were found.', file=sys.stderr)
+        return 1
+
+    results = drift(args.golden, paths, args.platform, args.sections, encoding=args.encoding, workers=args.workers)
+    dump = dump_json if args.format == 'json' else dump_csv
+
+    try:
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8', newline='') as f:
+                drifted, failed = dump(results, f)
+        else:
+            drifted, failed = dump(results, sys.stdout)
+    except (OSError, ValueError) as error:
+        print(f'Drift analysis failed: {error}', file=sys.stderr)
+        return 1
+
+    if failed:
+        print(f'Drift analysis completed with errors for {failed} of {len(paths)} files.', file=sys.stderr)
+        return 1
+
+    if drifted:
+        print(f'Drift from the golden config was found in {drifted} of {len(paths)} files.', file=sys.stderr)
+        return 1
+
+    return 0
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args = make_parser().parse_args(argv)
+
+    if args.command == 'run':
+        return run(args)
+    elif args.command == 'audit':
+        return run_audit(args)
+    elif args.command == 'drift':
+        return run_drift(args)
+
+    return 1
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+import os
+import csv
+import json
+
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from collections.abc import Iterable, Iterator
+from typing import Literal, Optional, TextIO
+
+from thymus.contexts import Context
+from thymus.settings import Platform
+from thymus.batch.batch import load_platform, build_context
+from thymus.batch.audit import collect_response
+
+
+@dataclass
+class SectionDrift:
+    section: str
+    status: Literal['same', 'drift', 'missing']
+    added: int = 0
+    removed: int = 0
+    output: list[str] = field(default_factory=list)
+
+
+@dataclass
+class DriftResult:
+    path: str
+    status: Literal['same', 'drift', 'error']
+    error: str = ''
+    sections: list[SectionDrift] = field(default_factory=list)
+
+
+# Every worker process loads a platform and builds the golden config only once.
+_platforms: dict[str, Platform] = {}
+_goldens: dict[tuple[str, str, str], Context] = {}
+
+
+def read_config(path: str, encoding: str = 'utf-8') -> list[str]:
+    """Function reads a config file. It raises ValueError with a message for the report if the file is unusable."""
+    try:
+        with open(path, encoding=encoding, errors='ignore') as f:
+            content = f.readlines()
+    except OSError as error:
+        raise ValueError(f'File "{path}" cannot be read: {error}.')
+
+    if not content:
+        raise ValueError(f'File "{path}" is empty.')
+
+    return content
+
+
+def get_golden(golden_path: str, platform_name: str, encoding: str = 'utf-8') -> Context:
+    """Function returns the context of the golden config. It is built on the first call in every process."""
+    key = (platform_name, golden_path, encoding)
+
+    if key not in _goldens:
+        if platform_name not in _platforms:
+            _platforms[platform_name] = load_platform(platform_name)
+
+        content = read_config(golden_path, encoding)
+
+        try:
+            _goldens[key] = build_context(_platforms[platform_name], content, encoding=encoding)
+        except Exception as error:
+            raise ValueError(f'Golden config "{golden_path}" cannot be opened: {error}')
+
+    return _goldens[key]
+
+
+def has_section(context: Context, section: str) -> bool:
+    response = context.on_enter(f'{context.alias_command_go} {section}')
+    result = collect_response(response).status == 'success'
+    context.on_enter(context.alias_command_top)
+
+    return result
+
+
+def compare_section(context: Context, golden: Context, section: str) -> SectionDrift:
+    """Function compares one section of the config with the same section of the golden config.
+
+    The golden context is the first neighbor of the config context, so the section is compared as a rollback.
+    """
+    command = f'show {section} | {context.alias_sub_command_diff} rollback {golden.context_id}'
+    command_result = collect_response(context.on_enter(command))
+    lines = [x for x in command_result.output if x.strip()]
+
+    if command_result.status == 'success':
+        result = SectionDrift(section, 'drift', output=lines)
+
+        for line in lines:
+            line = line.strip()
+
+            if line[1:].strip() in ('}', '!'):
+                continue  # closes an added or removed section, which is counted by its header
+
+            if line.startswith('+'):
+                result.added += 1
+            elif line.startswith('-'):
+                result.removed += 1
+
+        return result
+
+    # The diff fails for the same sections as well as for the missing ones, so the sections are looked up.
+    if has_section(context, section) != has_section(golden, section):
+        return SectionDrift(section, 'missing', output=lines)
+
+    return SectionDrift(section, 'same')
+
+
+def drift_file(
+    path: str, golden_path: str, platform_name: str, sections: list[str], encoding: str = 'utf-8'
+) -> DriftResult:
+    """Function builds a context for one config file and compares every section with the golden config.
+
+    It is a top-level function to be picklable by the process pool.
+    """
+    try:
+        golden = get_golden(golden_path, platform_name, encoding)
+        content = read_config(path, encoding)
+    except ValueError as error:
+        return DriftResult(path, 'error', str(error))
+
+    try:
+        # The golden context is the neighbor with ID 0, its own neighbors are not changed.
+        context = build_context(
+            _platforms[platform_name], content, encoding=encoding, context_id=1, neighbors=[golden]
+        )
+    except Exception as error:
+        return DriftResult(path, 'error', f'File "{path}" cannot be opened: {error}')
+
+    result = DriftResult(path, 'same')
+
+    try:
+        for section in sections:
+            section_result = compare_section(context, golden, section)
+
+            if section_result.status != 'same':
+                result.status = 'drift'
+
+            result.sections.append(section_result)
+    finally:
+        context.release()
+
+    return result
+
+
+def drift(
+    golden_path: str,
+    paths: list[str],
+    platform_name: str,
+    sections: list[str],
+    *,
+    encoding: str = 'utf-8',
+    workers: Optional[int] = None,
+) -> Iterator[DriftResult]:
+    """Function compares the sections of many config files with a golden config across a process pool.
+
+    Results are yielded in the order of the paths as soon as they are ready.
+    """
+    paths = [x for x in paths if os.path.abspath(x) != os.path.abspath(golden_path)]
+
+    if not paths:
+        return
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(paths))
+    chunksize = max(1, min(16, len(paths) // (workers * 4)))
+    task = partial(
+        drift_file, golden_path=golden_path, platform_name=platform_name, sections=sections, encoding=encoding
+    )
+
+    if workers == 1:
+        yield from map(task, paths)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(task, paths, chunksize=chunksize)
+
+
+def dump_json(results: Iterable[DriftResult], out: TextIO) -> tuple[int, int]:
+    """Function streams results as a JSON array. It returns the numbers of drifted and failed files."""
+    drifted = failed = 0
+
+    out.write('[')
+
+    for number, result in enumerate(results):
+        if result.status == 'drift':
+            drifted += 1
+        elif result.status == 'error':
+            failed += 1
+
+        if number:
+            out.write(',')
+
+        out.write('\n')
+        json.dump(asdict(result), out)
+
+    out.write('\n]\n')
+
+    return drifted, failed
+
+
+def dump_csv(results: Iterable[DriftResult], out: TextIO) -> tuple[int, int]:
+    """Function streams results as CSV rows, one row per file and section. It returns the numbers of drifted and
+    failed files.
+    """
+    drifted = failed = 0
+
+    writer = csv.writer(out)
+    writer.writerow(('path', 'section', 'status', 'added', 'removed', 'output'))
+
+    for result in results:
+        if result.status == 'drift':
+            drifted += 1
+        elif result.status == 'error':
+            failed += 1
+
+        if result.error:
+            writer.writerow((result.path, '', result.status, '', '', result.error))
+
+        for section in result.sections:
+            writer.writerow(
+                (
+                    result.path,
+                    section.section,
+                    section.status,
+                    section.added,
+                    section.removed,
+                    '\n'.join(section.output),
+                )
+            )
+
+    return drifted, failed
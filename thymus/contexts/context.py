@@ -3,15 +3,17 @@ from __future__ import annotations
 import re
 import shlex
 
+from hashlib import blake2b
 from functools import reduce
 from collections import deque
 
 from abc import ABC, abstractmethod
-from typing import Any
-from collections.abc import Iterator, Iterable
+from typing import Any, Optional
+from collections.abc import Callable, Iterator, Iterable
 
 from thymus.responses import Response, SystemResponse
 from thymus.lexers import CommonLexer
+from thymus.utils import Lines, PrefixIndex, get_spaces, get_regexp, find_increasing
 
 
 NAME_PATTERN = r'^[a-z][-_a-z0-9]{3,16}$'
@@ -27,12 +29,16 @@ class Context(ABC):
         '_cid',
         '_name',
         '_content',
+        '_loader',
         '_encoding',
         '_platform_settings',
         '_neighbors',
         '_spaces',
         '_up_limit',
         '_saves_dir',
+        '_index',
+        '_prefix_cache',
+        '_hashes',
         '_alias_command_show',
         '_alias_command_go',
         '_alias_command_top',
@@ -47,11 +53,13 @@ class Context(ABC):
         '_alias_sub_command_count',
         '_alias_sub_command_inactive',
         '_alias_sub_command_reveal',
+        '_alias_sub_command_quiet',
     )
     __names_cache: list[tuple[type[Context], str]] = []
 
     delimiter = '^'
     lexer = CommonLexer
+    fast_lexer: Optional[type] = None  # the same tokens as the lexer has, but faster
 
     # READ-ONLY PROPERTIES
 
@@ -63,6 +71,14 @@ class Context(ABC):
     def is_built(self) -> bool:
         return hasattr(self, '_tree') and self._tree
 
+    @property
+    def content(self) -> Lines:
+        if self._loader:
+            self._content = self._loader()
+            self._loader = None
+
+        return self._content
+
     @property
     @abstractmethod
     def tree(self) -> Any:
@@ -336,11 +352,25 @@ class Context(ABC):
 
         self._alias_sub_command_reveal = value
 
+    @property
+    def alias_sub_command_quiet(self) -> str:
+        return self._alias_sub_command_quiet
+
+    @alias_sub_command_quiet.setter
+    def alias_sub_command_quiet(self, value: str) -> None:
+        if type(value) is not str:
+            raise TypeError('Type of an alias for a sub-command must be "str".')
+
+        if not re.match(ALIAS_PATTERN, value, re.IGNORECASE):
+            raise ValueError('Incorrect value for a "quiet" sub-command alias.')
+
+        self._alias_sub_command_quiet = value
+
     def __init__(
         self,
         context_id: int,
         name: str,
-        content: list[str],
+        content: Iterable[str] | Callable[[], Lines],
         encoding: str,
         neighbors: list[Context],
         saves_dir: str,
@@ -348,7 +378,14 @@ class Context(ABC):
         self._cid = context_id
         self._name = name
         self._encoding = encoding
-        self._content = content
+        self._loader: Optional[Callable[[], Lines]] = None
+
+        # The content is a snapshot, it never changes. A callable returns it when the content is needed first.
+        if callable(content):
+            self._content = Lines()
+            self._loader = content
+        else:
+            self._content = content if isinstance(content, Lines) else Lines(content)
         self._neighbors = neighbors
         self._saves_dir = saves_dir
         self._spaces = 2
@@ -367,6 +404,7 @@ class Context(ABC):
         self._alias_sub_command_count = 'count'
         self._alias_sub_command_inactive = 'inactive'
         self._alias_sub_command_reveal = 'reveal'
+        self._alias_sub_command_quiet = 'quiet'
 
     def release(self) -> None:
         if (type(self), self._name) in self.__names_cache:
@@ -376,6 +414,200 @@ class Context(ABC):
     def build(self) -> None:
         raise NotImplementedError
 
+    def ensure_built(self) -> None:
+        if not self.is_built:
+            self.build()
+
+    def rebuild(self, source: Context, begin: int, end: int, size: int) -> None:
+        """Method builds the context after a commit to the source context, which replaced the lines of its content
+        from `begin` to `end` with `size` new lines. A platform can reuse the tree of the source context here,
+        by default the whole content is parsed again.
+        """
+        self.build()
+
+    # INDEX
+
+    @staticmethod
+    def _normalize_name(name: str) -> str:
+        name = name.lower()
+
+        if name.startswith('inactive: '):
+            name = name.replace('inactive: ', '', 1)
+
+        if name.startswith('protect: '):
+            name = name.replace('protect: ', '', 1)
+
+        return name.strip()
+
+    def _make_index(self, root: Any) -> None:
+        """Method builds a hash index from a normalized path to a node of the tree.
+
+        The path is a sequence of lowercased names without "inactive:" and "protect:" joined by new lines,
+        which cannot be a part of any name. A lookup stops at the first section with a name, so the later duplicates
+        of the section are not indexed along with their subtrees.
+        """
+        index: dict[str, Any] = {'': root}
+        stack = [(root, '')]
+
+        while stack:
+            node, key = stack.pop()
+
+            for child in node.children:
+                name = self._normalize_name(child.name)
+                child_key = f'{key}\n{name}' if key else name
+
+                if child_key in index:
+                    continue
+
+                index[child_key] = child
+                stack.append((child, child_key))
+
+        self._index = index
+        self._prefix_cache: dict[int, PrefixIndex] = {}
+
+    def _get_prefix_index(self, nodes: list[Any]) -> PrefixIndex:
+        """Method returns a sorted index of the normalized names for a list of sibling nodes.
+        The index is built when the list is visited for the first time and lives until the next build.
+        """
+        # The list belongs to the tree, so its id is stable while the tree is alive.
+        key = id(nodes)
+
+        if key not in self._prefix_cache:
+            self._prefix_cache[key] = PrefixIndex(self._normalize_name(node.name) for node in nodes)
+
+        return self._prefix_cache[key]
+
+    def _get_index_key(self, node: Any) -> Optional[str]:
+        """Method returns the key of the node in the index, or None if the node is not indexed."""
+        names: list[str] = []
+        current = node
+
+        while hasattr(current, 'parent'):
+            names.append(self._normalize_name(current.name))
+            current = current.parent
+
+        key = '\n'.join(reversed(names))
+
+        if self._index.get(key) is not node:
+            return None
+
+        return key
+
+    def _make_hashes(self, root: Any, known: Optional[dict[int, bytes]] = None) -> None:
+        """Method computes a Merkle hash of every subtree bottom-up. The hash of a node covers its own sign,
+        its stubs, and the hashes of its children, so two subtrees with the same hash have the same content and
+        a comparison can skip them without a walk. The `known` hashes are reused along with their subtrees.
+        """
+        # The nodes belong to the tree, so their ids are stable while the tree is alive.
+        hashes: dict[int, bytes] = dict(known) if known else {}
+        stack: list[tuple[Any, bool]] = [(root, False)]
+
+        while stack:
+            node, is_visited = stack.pop()
+
+            if id(node) in hashes:
+                continue
+
+            if not is_visited:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+
+            digest = blake2b(self._get_node_sign(node), digest_size=16)
+            digest.update('\n'.join(node.stubs).encode())
+            digest.update(b'\0')
+
+            for child in node.children:
+                digest.update(hashes[id(child)])
+
+            hashes[id(node)] = digest.digest()
+
+        self._hashes = hashes
+
+    def _get_node_sign(self, node: Any) -> bytes:
+        """Method returns the part of a node that is hashed along with its stubs and children."""
+        return node.name.encode() + b'\0'
+
+    def _get_node_title(self, node: Any) -> str:
+        """Method returns the name of a node as it is in the config."""
+        return node.name
+
+    def _is_same_subtree(self, node: Any, remote_context: Context, peer: Any) -> bool:
+        """Method checks whether the node of this context and the peer of the remote one have the same content."""
+        digest = self._hashes.get(id(node))
+
+        return digest is not None and digest == remote_context._hashes.get(id(peer))
+
+    def _provide_semantic_diff(self, target: Any, remote_context: Context, peer: Any) -> Iterator[str]:
+        """Method compares two subtrees regardless of the order of their sections and stubs.
+
+        Sections and stubs are matched by their normalized names through a dictionary. Every changed section
+        gets a hunk with the "[edit path]" header: "+" for the added names, "-" for the removed ones, and "~" for
+        the names that are in both subtrees, but moved. A move is a matched name that is out of the longest
+        sequence of names kept in the same order. The identical subtrees are skipped by their hashes.
+        """
+        stack = [(target, peer)]
+
+        while stack:
+            node, peer_node = stack.pop()
+
+            if self._is_same_subtree(node, remote_context, peer_node):
+                continue
+
+            hunk = list(self._match_names(node.stubs, peer_node.stubs))
+            pairs: list[tuple[int, int]] = []
+            names = [self._get_node_title(child) for child in node.children]
+            peer_names = [remote_context._get_node_title(child) for child in peer_node.children]
+
+            hunk.extend(self._match_names(names, peer_names, pairs=pairs))
+
+            if hunk:
+                path = node.path.replace(self.delimiter, ' ') if hasattr(node, 'parent') else ''
+                yield f'[edit {path}]' if path else '[edit]'
+                yield from hunk
+
+            stack.extend((node.children[x], peer_node.children[y]) for x, y in reversed(pairs))
+
+    def _match_names(
+        self, names: list[str], peer_names: list[str], *, pairs: Optional[list[tuple[int, int]]] = None
+    ) -> Iterator[str]:
+        """Method matches two lists of names, see `_provide_semantic_diff`. The positions of the matched names are
+        added to `pairs` if it is passed.
+        """
+        peer_positions: dict[str, deque[int]] = {}
+
+        for position, name in enumerate(peer_names):
+            peer_positions.setdefault(self._normalize_name(name), deque()).append(position)
+
+        added: list[str] = []
+        matched: list[tuple[int, int]] = []
+
+        for position, name in enumerate(names):
+            if positions := peer_positions.get(self._normalize_name(name)):
+                matched.append((position, positions.popleft()))
+            else:
+                added.append(name)
+
+        removed = sorted(x for positions in peer_positions.values() for x in positions)
+        kept = find_increasing([y for _, y in matched])
+
+        for position in removed:
+            yield f'-{peer_names[position]}'
+
+        for name in added:
+            yield f'+{name}'
+
+        for number, (x, y) in enumerate(matched):
+            if names[x] != peer_names[y]:
+                # the same name in another state, e.g., inactive
+                yield f'-{peer_names[y]}'
+                yield f'+{names[x]}'
+            elif number not in kept:
+                yield f'~{names[x]}'
+
+            if pairs is not None:
+                pairs.append((x, y))
+
     # COMMANDS
 
     @abstractmethod
@@ -426,7 +658,7 @@ class Context(ABC):
             yield FabricException(f'Incorrect arguments for "{self.alias_sub_command_filter}".')
 
         try:
-            regexp = re.compile(args[0])
+            regexp = get_regexp(args[0])
         except re.error:
             yield FabricException(f'Incorrect regular expression for "{self.alias_sub_command_filter}": {args[0]}.')
         else:
@@ -499,6 +731,23 @@ class Context(ABC):
         except StopIteration:
             yield FabricException()
 
+    def mod_quiet(self, data: Iterator[str | FabricException], args: list[str]) -> Iterator[str | FabricException]:
+        """Method checks whether the diff before it has found any difference. The diff stops at the first one."""
+        if args:
+            yield FabricException(f'There are no arguments for "{self.alias_sub_command_quiet}".')
+
+        try:
+            head = next(data)
+
+            if isinstance(head, Exception):
+                yield head
+            else:
+                yield '\n'
+                yield 'The contexts differ.'
+
+        except StopIteration:
+            yield FabricException()
+
     def on_enter(self, value: str) -> Response:
         try:
             args = reduce(  # type: ignore
@@ -569,6 +818,33 @@ class Context(ABC):
     def get_virtual_from(self, value: str) -> str:
         raise NotImplementedError
 
+    def get_window_end(self, begin: int, end: int, size: int) -> int:
+        """Method calculates where a window of the config that starts from `begin` ends. The window is at least
+        `size` lines long and it ends between two complete sections or statements of the same level, so it can be
+        edited and committed alone.
+
+        If there is no such a place, the window lasts up to `end`.
+        """
+        if size <= 0 or end - begin <= size:
+            return end
+
+        base = get_spaces(self._content[begin])
+
+        # the lines are read one by one, the boundary is usually close and the rest of the section is not copied
+        for number in range(begin + size, end):
+            previous, line = self._content[number - 1], self._content[number]
+
+            if get_spaces(previous) != base or get_spaces(line) != base:
+                continue
+
+            if self._is_window_boundary(previous, line):
+                return number
+
+        return end
+
+    def _is_window_boundary(self, previous: str, line: str) -> bool:
+        return False
+
     @staticmethod
     @abstractmethod
     def validate_commit(commit_data: Iterable[str]) -> None:
@@ -3,7 +3,7 @@ from __future__ import annotations
 import re
 
 from typing import Optional
-from collections.abc import Iterator, Iterable
+from collections.abc import Callable, Iterator, Iterable
 from collections import deque
 from copy import copy
 from itertools import chain
@@ -13,7 +13,7 @@ from thymus_ast import ios  # type: ignore
 from thymus.contexts import Context, FabricException
 from thymus.lexers import IOSLexer
 from thymus.responses import Response
-from thymus.utils import find_common
+from thymus.utils import Lines, find_common, get_regexp
 
 
 class IOSContext(Context):
@@ -182,7 +182,7 @@ class IOSContext(Context):
         self,
         context_id: int,
         name: str,
-        content: list[str],
+        content: Iterable[str] | Callable[[], Lines],
         encoding: str,
         neighbors: list[Context],
         saves_dir: str,
@@ -209,18 +209,160 @@ class IOSContext(Context):
             delimiter=self.delimiter,
             find_head=self._find_head,
         )
-        tree = ios.construct_tree_second(self._content, settings=settings)
+        data = list(self.content)  # the "promisc" mode may add the missing "end" to the data
+        tree = ios.construct_tree_second(data, settings=settings)
 
         if not tree:
             raise Exception('Context was not built.')
 
+        if len(data) != len(self._content):
+            self._content = Lines(data)
+
         self._tree = tree
         self._cursor: ios.Root | ios.Node = tree
         self._virtual_cursor: ios.Root | ios.Node = tree
         self._virtual_h_cursor: ios.Root | ios.Node = tree
+        self._make_index(tree)
+        self._make_hashes(tree)
 
     # PRIVATE METHODS
 
+    def _provide_compare(
+        self, target: ios.Root | ios.Node, remote_context: Context, peer: ios.Root | ios.Node
+    ) -> Iterator[str]:
+        """Method yields the same lines as ios.lazy_provide_compare does for the result of ios.compare_nodes,
+        but it walks both trees at once instead of building the compared tree.
+
+        The header of a section is held back until the first difference inside it, so the sections without
+        differences are not printed, and a consumer can stop the walk at any line. The subtrees that have the same
+        hash in both contexts are skipped. The children are matched by a dictionary.
+        """
+        pending: list[str] = []  # the headers of the walked sections without differences so far
+        alignment = self._spaces
+
+        def flush() -> Iterator[str]:
+            yield from pending
+            pending.clear()
+
+        def provide_subtree(node: ios.Node, sign: str, step: int, *, is_top=False) -> Iterator[str]:
+            # an added or a removed section is printed with its nested sections, but without its stubs
+            child_step = step
+
+            if node.is_accessible:
+                if path := self._get_compare_path(node):
+                    yield ' ' * step + sign + path
+
+                child_step += alignment
+
+            for child in node.children:
+                yield from provide_subtree(child, child.name[0] if child.name[0] in ('+', '-') else sign, child_step)
+
+            if not node.is_accessible:
+                return
+
+            if not is_top:
+                for stub in node.stubs:
+                    if stub.startswith('+') or stub.startswith('-'):
+                        yield ' ' * (step + alignment) + stub if path else stub
+
+            if path:
+                yield ' ' * step + sign + '!'
+
+        def walk(node: ios.Root | ios.Node, peer_node: ios.Root | ios.Node, step: int) -> Iterator[str]:
+            if node != peer_node or self._is_same_subtree(node, remote_context, peer_node):
+                return
+
+            level = len(pending)
+            child_step = step
+            path = ''
+
+            if node.is_accessible:
+                if path := self._get_compare_path(node):
+                    pending.append(' ' * step + path)
+
+                child_step += alignment
+
+            peers: dict[str, ios.Node] = {}
+            matched: set[int] = set()
+
+            for child in peer_node.children:
+                peers.setdefault(child.name, child)
+
+            for child in node.children:
+                if peer_child := peers.get(child.name):
+                    matched.add(id(peer_child))
+                    yield from walk(child, peer_child, child_step)
+                else:
+                    yield from flush()
+                    yield from provide_subtree(child, '+', child_step, is_top=True)
+
+            for child in peer_node.children:
+                if id(child) not in matched:
+                    yield from flush()
+                    yield from provide_subtree(child, '-', child_step, is_top=True)
+
+            if not node.is_accessible:
+                return
+
+            target_stubs = set(node.stubs)
+            peer_stubs = set(peer_node.stubs)
+            stubs = ['+' + x for x in target_stubs - peer_stubs] + ['-' + x for x in peer_stubs - target_stubs]
+
+            if stubs:
+                yield from flush()
+
+                for stub in stubs:
+                    yield ' ' * (step + alignment) + stub if path else stub
+
+            if not path:
+                return
+
+            if len(pending) > level:
+                pending.pop()
+            else:
+                yield ' ' * step + '!'
+
+        yield from walk(target, peer, -1)
+
+    def _get_compare_path(self, node: ios.Root | ios.Node) -> str:
+        """Method returns the path of a node from its last accessible parent, as ios.lazy_provide_compare does."""
+        path = node.path
+
+        if type(node) is ios.Node:
+            parent = node.parent
+
+            while type(parent) is ios.Node and not parent.is_accessible:
+                parent = parent.parent
+
+            path = path.replace(parent.path, '', 1)
+
+        return path.replace(self.delimiter, ' ').strip()
+
+    def _search_node(self, path: deque[str], node: ios.Root | ios.Node, *, accessibility=True) -> Optional[ios.Node]:
+        """Method does the same as ios.search_node, but it resolves every step of the path through the index.
+        It also eats the path from its head.
+        """
+        if (key := self._get_index_key(node)) is None:
+            return ios.search_node(path, node, accessibility=accessibility)
+
+        while True:
+            step = path.popleft()
+            step = step.lower()
+
+            if '\n' in step:
+                return None
+
+            key = f'{key}\n{step}' if key else step
+
+            if not (child := self._index.get(key)):
+                return None
+
+            if not path:
+                if accessibility and not child.is_accessible:
+                    return None
+
+                return child
+
     def _update_virtual_cursor(self, parts: deque[str], *, heuristics=False) -> Iterator[str]:
         # heuristics here is a marker that spots which cursor and its nodes to use
         if not parts:
@@ -233,24 +375,25 @@ class IOSContext(Context):
         if head == '|':
             yield from map(lambda node: node.name, target)
 
-        for child in target:
-            # We ignore `is_accessible` flag because the virtual cursors are actually virtual.
-            if child.name.lower() == head:
-                if heuristics:
-                    self._virtual_h_cursor = child
-                else:
-                    self._virtual_cursor = child
+        prefix_index = self._get_prefix_index(target)
 
-                if parts:
-                    yield from self._update_virtual_cursor(parts, heuristics=heuristics)
-                else:
-                    yield from filter(lambda name: name.lower().startswith(head), map(lambda node: node.name, target))
+        # We ignore `is_accessible` flag because the virtual cursors are actually virtual.
+        if (position := prefix_index.find(head)) != -1:
+            if heuristics:
+                self._virtual_h_cursor = target[position]
+            else:
+                self._virtual_cursor = target[position]
 
-                return
+            if parts:
+                yield from self._update_virtual_cursor(parts, heuristics=heuristics)
+            else:
+                yield from map(lambda x: target[x].name, prefix_index.starts_with(head))
+
+            return
 
         # no child found
         # so, try to get all matched then
-        yield from filter(lambda name: name.lower().startswith(head), map(lambda node: node.name, target))
+        yield from map(lambda x: target[x].name, prefix_index.starts_with(head))
 
     def _inspect_children_path(self, node: ios.Root | ios.Node, parent_path: str) -> Iterator[str]:
         for child in node.children:
@@ -318,6 +461,13 @@ class IOSContext(Context):
                 elif command == self.alias_sub_command_diff:
                     check_leading_mod(command, number, len(element[1:]), skip=True)
                     modified_data = self.mod_diff(element[1:], jump_node)
+                # Quiet
+                elif command == self.alias_sub_command_quiet:
+                    if not number or mods[number - 1][0] != self.alias_sub_command_diff:
+                        raise FabricException(f'"{command}" can be used only after "{self.alias_sub_command_diff}".')
+
+                    modified_data = self.mod_quiet(modified_data, element[1:])
+                    break
                 # Contains
                 elif command == self.alias_sub_command_contains:
                     check_leading_mod(command, number, len(element[1:]), 1)
@@ -359,7 +509,7 @@ class IOSContext(Context):
             else:
                 copied_path = copy(args)
 
-                if node := ios.search_node(args, self._cursor):
+                if node := self._search_node(args, self._cursor):
                     if mods:
                         return self._process_fabric(
                             data=ios.lazy_provide_config(self._content, node, alignment=self._spaces, is_started=True),
@@ -391,7 +541,7 @@ class IOSContext(Context):
         if not args:
             return Response.error(f'Not enough arguments for "{self.alias_command_go}".')
 
-        if node := ios.search_node(args, self._cursor):
+        if node := self._search_node(args, self._cursor):
             self._cursor = node
         else:
             return Response.error('This path is incorrect.')
@@ -466,6 +616,12 @@ class IOSContext(Context):
     # MODS
 
     def mod_diff(self, args: list[str], jump_node: Optional[ios.Node] = None) -> Iterator[str | FabricException]:
+        # e.g., "semantic rollback 1", the order of sections and stubs is ignored then
+        is_semantic = bool(args) and args[0] == 'semantic'
+
+        if is_semantic:
+            args = args[1:]
+
         if not args:
             yield FabricException(f'There must be at least one argument for "{self.alias_sub_command_diff}".')
         elif len(args) > 2:
@@ -489,6 +645,7 @@ class IOSContext(Context):
                 yield FabricException(f'Incorrect ID for the target context: {context_id}.')
 
             remote_context = self._neighbors[context_id]
+            remote_context.ensure_built()  # the contexts restored from the history are built on demand
         else:
             # Regular case
             if not self.name:
@@ -517,14 +674,22 @@ class IOSContext(Context):
         if target.name == 'root':
             peer = remote_context.tree
         else:
-            peer = ios.search_node(deque(target.path.split(self.delimiter)), remote_context.tree)
+            peer = remote_context._search_node(deque(target.path.split(self.delimiter)), remote_context.tree)
 
         if not peer:
             yield FabricException(f'Remote context lacks this path: {target.path.replace(self.delimiter, " ")}.')
+            return
 
-        if compared := ios.compare_nodes(target, peer):
+        if is_semantic:
+            lines = self._provide_semantic_diff(target, remote_context, peer)
+        else:
+            lines = self._provide_compare(target, remote_context, peer)
+
+        # the walk stops as soon as the consumer does, e.g., "quiet" takes only the first difference
+        if line := next(lines, None):
             yield '\n'
-            yield from ios.lazy_provide_compare(compared, delimiter=self.delimiter, alignment=self._spaces)
+            yield line
+            yield from lines
         else:
             yield FabricException('Fail to compare the contexts. The same content?')
 
@@ -553,7 +718,7 @@ class IOSContext(Context):
             yield FabricException(f'Incorrect arguments for "{self.alias_sub_command_wildcard}".')
 
         try:
-            regexp = re.compile(args[0])
+            regexp = get_regexp(args[0])
         except re.error:
             yield FabricException(f'Incorrect regular expression for "{self.alias_sub_command_wildcard}": {args[0]}.')
         else:
@@ -571,7 +736,7 @@ class IOSContext(Context):
                     yield '\n'
 
                     for path, child in self._inspect_children_pair(node, node.path):
-                        if re.search(regexp, path):
+                        if regexp.search(path):
                             yield from ios.lazy_provide_config(
                                 self._content, child, alignment=self._spaces, is_started=True
                             )
@@ -589,10 +754,10 @@ class IOSContext(Context):
             if not node.is_accessible:
                 return
 
-            if re.search(args[0], node.path.replace(self.delimiter, ' ')):
+            if regexp.search(node.path.replace(self.delimiter, ' ')):
                 yield replace_path(node.path, path)
 
-            for stub in filter(lambda x: re.search(args[0], x), node.stubs):
+            for stub in filter(regexp.search, node.stubs):
                 yield f'{replace_path(node.path, path)}: "{stub}"' if node.path else f'"{stub}"'
 
         if len(args) != 1:
@@ -604,9 +769,10 @@ class IOSContext(Context):
             yield FabricException('No sections at this level.')
 
         try:
-            re.compile(args[0])
+            regexp = get_regexp(args[0])
         except re.error:
             yield FabricException(f'Incorrect regular expression for "{self.alias_sub_command_contains}": {args[0]}.')
+            return
 
         yield '\n'
         yield from lookup_child(node, node.path)
@@ -617,7 +783,7 @@ class IOSContext(Context):
         node: Optional[ios.Root | ios.Node] = None
 
         if virtual_path:
-            node = ios.search_node(deque(virtual_path.split(self.delimiter)), self._tree)
+            node = self._search_node(deque(virtual_path.split(self.delimiter)), self._tree)
 
             if not node:
                 virtual_path = virtual_path.replace(self.delimiter, ' ')
@@ -753,6 +919,9 @@ class IOSContext(Context):
         else:
             return modified_input.replace(s, '', 1)
 
+    def _is_window_boundary(self, previous: str, line: str) -> bool:
+        return previous.strip() == '!'
+
     # STATIC METHODS
 
     @staticmethod
@@ -3,15 +3,15 @@ from __future__ import annotations
 import re
 
 from typing import Optional, cast
-from collections.abc import Iterator, Iterable
+from collections.abc import Callable, Iterator, Iterable
 from collections import deque
 
 from thymus_ast import junos_ng as junos  # type: ignore
 
 from thymus.contexts import Context, FabricException
-from thymus.lexers import JunosLexer
+from thymus.lexers import JunosLexer, FastJunosLexer
 from thymus.responses import Response
-from thymus.utils import find_common, dot_notation_fix
+from thymus.utils import Lines, find_common, dot_notation_fix, get_regexp
 
 
 class JunosContext(Context):
@@ -23,6 +23,7 @@ class JunosContext(Context):
     __store: list[JunosContext] = []
 
     lexer = JunosLexer
+    fast_lexer = FastJunosLexer
 
     @property
     def tree(self) -> junos.Root:
@@ -47,7 +48,7 @@ class JunosContext(Context):
         self,
         context_id: int,
         name: str,
-        content: list[str],
+        content: Iterable[str] | Callable[[], Lines],
         encoding: str,
         neighbors: list[Context],
         saves_dir: str,
@@ -61,67 +62,300 @@ class JunosContext(Context):
         super().release()
 
     def build(self) -> None:
-        tree = junos.construct_tree(self._content, delimiter=self.delimiter)
+        tree = junos.construct_tree(self.content, delimiter=self.delimiter)
         if not tree:
             raise Exception('Context was not built.')
 
         self._tree = tree
         self._cursor: junos.Root | junos.Node = tree
         self._virtual_cursor: junos.Root | junos.Node = tree
+        self._make_index(tree)
+        self._make_hashes(tree)
+
+    def rebuild(self, source: Context, begin: int, end: int, size: int) -> None:
+        """Method parses again only the section that was committed. The rest of the tree is copied from
+        the source context with the line numbers after the section shifted. The source tree is not changed,
+        the previous contexts still use it.
+        """
+        edited = source.cursor
+
+        if type(edited) is not junos.Node or self.delimiter != source.delimiter:
+            return self.build()
+
+        if begin != edited.begin + 1 or not begin <= end <= edited.end:
+            return self.build()
+
+        shift = size - (end - begin)
+        known: dict[int, bytes] = {}  # the hashes of the sections that do not contain the edited one
+        body_end = edited.end + shift
+        body = self._content[begin:body_end]
+        subtree = junos.construct_tree(body, delimiter=self.delimiter)
+
+        # A stray closing bracket would close the edited section itself, so the whole tree is different then.
+        if not subtree or not self._is_balanced(subtree, body) or self._content[body_end].strip() != '}':
+            return self.build()
+
+        def clone(node: junos.Node, parent: junos.Root | junos.Node) -> junos.Node:
+            # the sections after the edited one are moved, the sections that contain it are resized
+            begin_shift = shift if node.begin > edited.end else 0
+            end_shift = shift if node.end >= edited.end else 0
+            new_node = junos.Node(
+                name=node.name,
+                path=node.path,
+                parent=parent,
+                children=[],
+                stubs=node.stubs,
+                is_closed=node.is_closed,
+                is_inactive=node.is_inactive,
+                is_protect=node.is_protect,
+                begin=node.begin + begin_shift,
+                end=node.end + end_shift,
+            )
+
+            if node is edited:
+                new_node.stubs = subtree.stubs
+                new_node.children = [graft(child, new_node) for child in subtree.children]
+            else:
+                new_node.children = [clone(child, new_node) for child in node.children]
+
+                if not node.begin <= edited.begin <= edited.end <= node.end and id(node) in source._hashes:
+                    known[id(new_node)] = source._hashes[id(node)]
+
+            return new_node
+
+        def graft(node: junos.Node, parent: junos.Root | junos.Node) -> junos.Node:
+            node.parent = parent
+            node.path = f'{edited.path}{self.delimiter}{node.path}'
+            node.begin += begin
+            node.end += begin
+
+            for child in node.children:
+                graft(child, node)
+
+            return node
+
+        old_tree = cast(junos.Root, source.tree)
+        tree = junos.Root(
+            name=old_tree.name,
+            path=old_tree.path,
+            version=old_tree.version,
+            delimiter=old_tree.delimiter,
+            children=[],
+            stubs=old_tree.stubs,
+            begin=old_tree.begin,
+            end=old_tree.end + shift,
+        )
+        tree.children = [clone(child, tree) for child in old_tree.children]
+
+        self._tree = tree
+        self._cursor = tree
+        self._virtual_cursor = tree
+        self._make_index(tree)
+        self._make_hashes(tree, known)
 
     # PRIVATE METHODS
 
-    def _update_virtual_cursor(self, parts: deque[str]) -> Iterator[str]:
-        def get_heads(node: junos.Root | junos.Node, comp: str) -> Iterator[str]:
+    def _get_node_sign(self, node: junos.Root | junos.Node) -> bytes:
+        sign = super()._get_node_sign(node)
+
+        if type(node) is junos.Node:
+            sign += b'i' if node.is_inactive else b'-'
+            sign += b'p' if node.is_protect else b'-'
+
+        return sign
+
+    def _get_node_title(self, node: junos.Root | junos.Node) -> str:
+        title = node.name
+
+        if type(node) is junos.Node:
+            title = f'protect: {title}' if node.is_protect else title
+            title = f'inactive: {title}' if node.is_inactive else title
+
+        return title
+
+    def _provide_compare(
+        self, target: junos.Root | junos.Node, remote_context: Context, peer: junos.Root | junos.Node
+    ) -> Iterator[str]:
+        """Method yields the same lines as junos.lazy_provide_compare does for the result of junos.compare_nodes,
+        but it walks both trees at once instead of building the compared tree.
+
+        The header of a section is held back until the first difference inside it, so the sections without
+        differences are not printed, and a consumer can stop the walk at any line. The subtrees that have the same
+        hash in both contexts are skipped. The children are matched by a dictionary.
+        """
+        pending: list[str] = []  # the headers of the walked sections without differences so far
+
+        def flush() -> Iterator[str]:
+            yield from pending
+            pending.clear()
+
+        def walk(node: junos.Root | junos.Node, peer_node: junos.Root | junos.Node, *, skip=False) -> Iterator[str]:
+            if node.name != peer_node.name or self._is_same_subtree(node, remote_context, peer_node):
+                return
+
+            level = len(pending)
+            title = self._get_compare_title(node, peer_node)
+
+            if not skip:
+                pending.append(title + ' {')
+
+            peers: dict[str, junos.Node] = {}
+            matched: set[int] = set()
+
+            for child in peer_node.children:
+                peers.setdefault(child.name, child)
+
             for child in node.children:
-                name = child.name.lower()
-                if name.startswith('inactive: '):
-                    name = name.replace('inactive: ', '')
+                if peer_child := peers.get(child.name):
+                    matched.add(id(peer_child))
+                    yield from walk(child, peer_child)
+                else:
+                    yield from flush()
+                    yield f'+{child.name} {{'
+                    yield '+}'
 
-                if name.startswith('protect: '):
-                    name = name.replace('protect: ', '')
-                name = name.strip()
+            for child in peer_node.children:
+                if id(child) not in matched:
+                    yield from flush()
+                    yield f'-{child.name} {{'
+                    yield '-}'
 
-                if name.startswith(comp):
-                    yield child.name
+            target_stubs = set(node.stubs)
+            peer_stubs = set(peer_node.stubs)
+            stubs = ['+' + x for x in target_stubs - peer_stubs] + ['-' + x for x in peer_stubs - target_stubs]
 
-        if not parts or not self._virtual_cursor.children:
-            return
+            if stubs:
+                yield from flush()
+                yield from stubs
 
-        head = parts.popleft()
-        if head == '|':
-            # enlist all possible sections
-            yield from map(lambda x: x.name, self._virtual_cursor.children)
-            return
+            if skip:
+                return
+
+            if len(pending) > level:
+                pending.pop()
+            else:
+                yield title[0] + '}' if title[0] in ('+', '-') else '}'
+
+        yield from walk(target, peer, skip=True)
+
+    @staticmethod
+    def _get_compare_title(node: junos.Root | junos.Node, peer: junos.Root | junos.Node) -> str:
+        title = node.name
+
+        if type(node) is junos.Node and type(peer) is junos.Node:
+            if node.is_protect != peer.is_protect:
+                title = ('protect(-): ' if node.is_protect else 'protect(+): ') + title
+
+            if node.is_inactive != peer.is_inactive:
+                title = ('inactive(+): ' if node.is_inactive else 'inactive(-): ') + title
+
+        return title
+
+    @staticmethod
+    def _is_balanced(tree: junos.Root, data: list[str]) -> bool:
+        """Method checks that every section of the tree is closed and there are no other closing brackets."""
+        sections = 0
+        stack = list(tree.children)
+
+        while stack:
+            node = stack.pop()
+
+            if not node.is_closed:
+                return False
+
+            sections += 1
+            stack.extend(node.children)
 
-        for child in self._virtual_cursor.children:
-            name = child.name.lower()
-            if name.startswith('inactive: '):
-                name = name.replace('inactive: ', '')
+        closings = 0
 
-            if name.startswith('protect: '):
-                name = name.replace('protect: ', '')
-            name = name.strip()
+        for line in data:
+            stripped = line.strip()
+
+            if '}' in stripped and '{' not in stripped and ';' not in stripped:
+                closings += 1
+
+        return sections == closings
+
+    def _search_node(self, path: deque[str], node: junos.Root | junos.Node) -> Optional[junos.Node]:
+        """Method does the same as junos.search_node, but it resolves every step of the path through the index.
+        It also eats the path from its head.
+        """
+        if (key := self._get_index_key(node)) is None:
+            return junos.search_node(path, node)
+
+        while path:
+            step = path.popleft()
+            step = step.lower()
+
+            if '\n' in step:
+                return None
+
+            if '.' in step and node.name == 'interfaces':
+                try:
+                    ifd, ifl = step.split('.')
+                except ValueError:
+                    return None
+
+                if not ifd or not ifl or not ifl.isdigit():
+                    return None
+
+                step = ifd
+                path.appendleft('unit ' + ifl)
+
+            if not node.children:
+                return None
+
+            child_key = f'{key}\n{step}' if key else step
+
+            if child := self._index.get(child_key):
+                if not path:
+                    return child
+
+                node = child
+                key = child_key
+                continue
+
+            if not path:
+                return None
+
+            # the name of a section may consist of several words
+            extra = path.popleft()
+            path.appendleft(step + ' ' + extra)
+
+        return None
+
+    def _update_virtual_cursor(self, parts: deque[str]) -> Iterator[str]:
+        while parts and self._virtual_cursor.children:
+            children = self._virtual_cursor.children
+            head = parts.popleft()
+
+            if head == '|':
+                # enlist all possible sections
+                yield from map(lambda x: x.name, children)
+                return
+
+            prefix_index = self._get_prefix_index(children)
+
+            if (position := prefix_index.find(head)) != -1:
+                self._virtual_cursor = children[position]
 
-            if name == head:
-                self._virtual_cursor = child
                 if not parts:
                     # nothing left to check in the path
                     # return all encounters
-                    yield from get_heads(child.parent, head)
-                else:
-                    yield from self._update_virtual_cursor(parts)
+                    yield from map(lambda x: children[x].name, prefix_index.starts_with(head))
+                    return
+
+                continue
+
+            # no encounters have been found
+            if not parts:
+                # showing all sections that names start with the head
+                yield from map(lambda x: children[x].name, prefix_index.starts_with(head))
+                return
 
-                return  # we have found all encounters at this stage and can leave
-        # no encounters have been found
-        if parts:
             # let's see if we can find a doubled match
             extra = parts.popleft()
             parts.appendleft(head + ' ' + extra)
-            yield from self._update_virtual_cursor(parts)
-        else:
-            # showing all sections that names start with the head
-            yield from get_heads(self._virtual_cursor, head)
 
     def _prepand_nop(self, data: Iterable[str]) -> Iterator[str | FabricException]:
         """
@@ -174,6 +408,14 @@ class JunosContext(Context):
                     check_leading_mod(command, number, len(element[1:]), skip=True)
                     modified_data = self.mod_diff(element[1:], jump_node)
                     flat_output = False
+                # Quiet
+                elif command == self.alias_sub_command_quiet:
+                    if not number or mods[number - 1][0] != self.alias_sub_command_diff:
+                        raise FabricException(f'"{command}" can be used only after "{self.alias_sub_command_diff}".')
+
+                    modified_data = self.mod_quiet(modified_data, element[1:])
+                    flat_output = True
+                    break
                 # Inactive
                 elif command == self.alias_sub_command_inactive:
                     check_leading_mod(command, number, len(element[1:]))
@@ -238,7 +480,7 @@ class JunosContext(Context):
                 else:
                     return Response.error('No version found.')
             else:
-                if node := junos.search_node(args, self._cursor):
+                if node := self._search_node(args, self._cursor):
                     data = self._content[node.begin + 1 : node.end]
 
                     if mods:
@@ -264,7 +506,7 @@ class JunosContext(Context):
         if not args:
             return Response.error(f'Not enough arguments for "{self.alias_command_go}".')
 
-        if node := junos.search_node(args, self._cursor):
+        if node := self._search_node(args, self._cursor):
             self._cursor = node
             return Response.success()
 
@@ -341,7 +583,8 @@ class JunosContext(Context):
             yield FabricException(f'Incorrect arguments for "{self.alias_sub_command_wildcard}".')
 
         try:
-            re.compile(args[0])
+            # validation only, the parser takes the pattern as a string and extends it before matching
+            get_regexp(args[0])
         except re.error:
             yield FabricException(f'Incorrect regular expression for "{self.alias_sub_command_wildcard}": {args[0]}.')
         else:
@@ -358,6 +601,12 @@ class JunosContext(Context):
                 yield FabricException()
 
     def mod_diff(self, args: list[str], jump_node: Optional[junos.Node] = None) -> Iterator[str | FabricException]:
+        # e.g., "semantic rollback 1", the order of sections and stubs is ignored then
+        is_semantic = bool(args) and args[0] == 'semantic'
+
+        if is_semantic:
+            args = args[1:]
+
         if not args:
             yield FabricException(f'There must be at least one argument for "{self.alias_sub_command_diff}".')
         elif len(args) > 2:
@@ -381,6 +630,7 @@ class JunosContext(Context):
                 yield FabricException(f'Incorrect ID for the target context: {context_id}.')
 
             remote_context = self._neighbors[context_id]
+            remote_context.ensure_built()  # the contexts restored from the history are built on demand
         else:
             # Regular case
             context_name = args[0]
@@ -405,23 +655,25 @@ class JunosContext(Context):
 
         if target.name == 'root':
             peer = remote_context.tree
-
-            if compared := junos.compare_nodes(target, peer):
-                yield '\n'
-                yield from junos.lazy_provide_compare(compared)
-            else:
-                yield FabricException('Fail to compare the contexts. The same content?')
         else:
             path = junos.make_path(target.path, delimiter=self.delimiter)
 
-            if peer := junos.search_node(path, remote_context.tree):
-                if compared := junos.compare_nodes(target, peer):
-                    yield '\n'
-                    yield from junos.lazy_provide_compare(compared)
-                else:
-                    yield FabricException('Fail to compare the contexts. The same content?')
-            else:
+            if not (peer := remote_context._search_node(path, remote_context.tree)):
                 yield FabricException('Comparing context lacks this path.')
+                return
+
+        if is_semantic:
+            lines = self._provide_semantic_diff(target, remote_context, peer)
+        else:
+            lines = self._provide_compare(target, remote_context, peer)
+
+        # the walk stops as soon as the consumer does, e.g., "quiet" takes only the first difference
+        if line := next(lines, None):
+            yield '\n'
+            yield line
+            yield from lines
+        else:
+            yield FabricException('Fail to compare the contexts. The same content?')
 
     def mod_inactive(self, jump_node: Optional[junos.Node] = None) -> Iterator[str | FabricException]:
         node = jump_node if jump_node else self._cursor
@@ -457,10 +709,10 @@ class JunosContext(Context):
             for child in node.children:
                 yield from lookup_child(child, path)
 
-            if re.search(args[0], node.name):
+            if regexp.search(node.name):
                 yield replace_path(node.path, path)
 
-            for stub in filter(lambda stub: re.search(args[0], stub), node.stubs):
+            for stub in filter(regexp.search, node.stubs):
                 yield f'{replace_path(node.path, path)}: "{stub}"'
 
         if len(args) != 1:
@@ -472,9 +724,10 @@ class JunosContext(Context):
             yield FabricException('No sections at this level.')
 
         try:
-            re.compile(args[0])
+            regexp = get_regexp(args[0])
         except re.error:
             yield FabricException(f'Incorrect regular expression for "{self.alias_sub_command_contains}": {args[0]}.')
+            return
 
         yield '\n'
         yield from lookup_child(node, node.path)
@@ -486,7 +739,7 @@ class JunosContext(Context):
 
         if virtual_path:
             modified_path = junos.make_path(virtual_path, delimiter=self.delimiter)
-            node = junos.search_node(modified_path, self._tree)
+            node = self._search_node(modified_path, self._tree)
 
             if not node:
                 virtual_path = virtual_path.replace(self.delimiter, ' ')
@@ -586,6 +839,9 @@ class JunosContext(Context):
 
         return new_value
 
+    def _is_window_boundary(self, previous: str, line: str) -> bool:
+        return previous.rstrip().endswith(('}', ';')) and line.strip() != '}'
+
     # STATICMETHODS
 
     @staticmethod
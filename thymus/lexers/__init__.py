@@ -4,10 +4,13 @@ __all__ = (
     'CommonLexer',
     'SyslogLexer',
     'JunosLexer',
+    'FastJunosLexer',
     'IOSLexer',
+    'lex_line',
+    'lex_lines',
 )
 
 
-from .common import IPV4_REGEXP, IPV6_REGEXP, CommonLexer, SyslogLexer
-from .junos import JunosLexer
+from .common import IPV4_REGEXP, IPV6_REGEXP, CommonLexer, SyslogLexer, lex_line, lex_lines
+from .junos import JunosLexer, FastJunosLexer
 from .ios import IOSLexer
@@ -3,6 +3,8 @@ __all__ = (
     'IPV6_REGEXP',
     'CommonLexer',
     'SyslogLexer',
+    'lex_line',
+    'lex_lines',
 )
 
 
@@ -14,3 +16,7 @@ from .common import (
     CommonLexer,
     SyslogLexer,
 )
+from .highlighter import (
+    lex_line,
+    lex_lines,
+)
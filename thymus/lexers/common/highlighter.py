@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional
+from collections.abc import Iterable, Iterator
+
+from pygments.lexer import Lexer, RegexLexer  # type: ignore
+from pygments.token import Error, Whitespace, _TokenType  # type: ignore
+
+
+LINES_CACHE_SIZE = 65536
+
+Tokens = tuple[tuple[_TokenType, str], ...]
+# The stack of a regex lexer and the whitespace before the next line that is not lexed yet. The whitespace is None
+# at the start of a block.
+State = tuple[tuple[str, ...], Optional[str]]
+
+START: State = (('root',), None)
+
+
+@lru_cache(maxsize=None)
+def get_lexer(lexer_type: type[Lexer]) -> Lexer:
+    return lexer_type()
+
+
+@lru_cache(maxsize=LINES_CACHE_SIZE)
+def lex_line(lexer_type: type[Lexer], line: str, state: State = START) -> tuple[Tokens, State]:
+    """Function lexes a line that is not blank, a regex lexer resumes from the state where the previous lines left it.
+
+    The rules of a lexer may match the whitespace at the end of a line together with the next line (e.g., the
+    stager of JunosLexer takes the newline as a separator), so the lexing stops at the last visible symbol of the line
+    and the rest is lexed along with the next one. The tokens are of the text from where the previous line stopped,
+    lex_lines splits them into lines. The cache is keyed by the state, the same lines of a repeated output are taken
+    from it.
+    """
+    stack, pending = state
+
+    if pending is None:
+        text, pos = line + '\n', 0
+    elif pending:
+        text, pos = pending + line + '\n', 0
+    else:
+        text, pos = '\n' + line + '\n', 1  # the newline is lexed already, but the rules may look behind
+
+    end = len(text) - (len(line) - len(line.rstrip())) - 1
+    tokens, stack, stop = _resume(get_lexer(lexer_type), text, pos, end, stack)
+
+    return _clip(text, tokens, pos, stop), (stack, text[stop:])
+
+
+def lex_lines(lexer: Lexer, lines: Iterable[str]) -> Iterator[Tokens]:
+    """Function yields the tokens of every line as if all the lines were lexed at once.
+
+    The exception is a rule that looks past the last visible symbol of a line, it does not see the next line (e.g.,
+    a "##" comment on the line after a JunOS statement is not taken as its inline comment). The lexers that are not
+    regex ones lex every line alone, as their get_tokens does.
+    """
+    lexer_type = type(lexer)
+
+    if not isinstance(lexer, RegexLexer):
+        for line in lines:
+            yield _lex_alone(lexer_type, line)
+
+        return
+
+    state = START
+    current: list[tuple[_TokenType, str]] = []
+
+    for line in lines:
+        if not line.strip():
+            # the whitespace is lexed along with the next line that is not blank
+            stack, pending = state
+            state = (stack, (pending or '') + line + '\n')
+            continue
+
+        tokens, state = lex_line(lexer_type, line, state)
+        yield from _split(tokens, current)
+
+    # the whitespace after the last line, pygments lexes it up to the end of the text
+    stack, pending = state
+
+    if pending:
+        tokens, _, stop = _resume(get_lexer(lexer_type), pending, 0, len(pending), stack)
+        yield from _split(_clip(pending, tokens, 0, stop), current)
+
+
+@lru_cache(maxsize=LINES_CACHE_SIZE)
+def _lex_alone(lexer_type: type[Lexer], line: str) -> Tokens:
+    tokens: list[tuple[_TokenType, str]] = []
+
+    for token_type, value in get_lexer(lexer_type).get_tokens(line):
+        if value:
+            tokens.append((token_type, value))
+
+    # pygments always adds a newline, it is either a token or the tail of the last one
+    if tokens:
+        token_type, value = tokens.pop()
+
+        if value := value[:-1] if value.endswith('\n') else value:
+            tokens.append((token_type, value))
+
+    return tuple(tokens)
+
+
+def _clip(text: str, tokens: list[tuple[int, _TokenType, str]], begin: int, end: int) -> Tokens:
+    """Function returns the tokens of the text from `begin` to `end`.
+
+    A rule may leave a group without a token type (e.g., the newline of "shutdown" in IOSLexer), the text of such
+    a group is kept as a whitespace, so the lines are split at the same places.
+    """
+    result: list[tuple[_TokenType, str]] = []
+    last = begin
+
+    for pos, token_type, value in tokens:
+        start = max(pos, begin)
+
+        if start > last:
+            result.append((Whitespace, text[last:start]))
+            last = start
+
+        if value := value[start - pos : end - pos]:
+            result.append((token_type, value))
+            last = max(last, start + len(value))
+
+    if end > last:
+        result.append((Whitespace, text[last:end]))
+
+    return tuple(result)
+
+
+def _split(tokens: Tokens, current: list[tuple[_TokenType, str]]) -> Iterator[Tokens]:
+    # `current` collects the tokens of the line that is not complete yet
+    for token_type, value in tokens:
+        head, *rest = value.split('\n')
+
+        if head:
+            current.append((token_type, head))
+
+        for part in rest:
+            yield tuple(current)
+            current.clear()
+
+            if part:
+                current.append((token_type, part))
+
+
+def _resume(
+    lexer: RegexLexer, text: str, pos: int, end: int, stack: tuple[str, ...]
+) -> tuple[list[tuple[int, _TokenType, str]], tuple[str, ...], int]:
+    """Function repeats RegexLexer.get_tokens_unprocessed from the position and the stack while it is before `end`.
+
+    It returns the tokens, and the stack and the position where it stopped, which pygments does not expose.
+    """
+    tokens: list[tuple[int, _TokenType, str]] = []
+    tokendefs = lexer._tokens
+    statestack = list(stack)
+    statetokens = tokendefs[statestack[-1]]
+
+    while pos < end:
+        for rexmatch, action, new_state in statetokens:
+            if match := rexmatch(text, pos):
+                if action is not None:
+                    if type(action) is _TokenType:
+                        tokens.append((pos, action, match.group()))
+                    else:
+                        tokens.extend(action(lexer, match))
+
+                pos = match.end()
+
+                if new_state is not None:
+                    if isinstance(new_state, tuple):
+                        for state in new_state:
+                            if state == '#pop':
+                                if len(statestack) > 1:
+                                    statestack.pop()
+                            elif state == '#push':
+                                statestack.append(statestack[-1])
+                            else:
+                                statestack.append(state)
+                    elif isinstance(new_state, int):
+                        if abs(new_state) >= len(statestack):
+                            del statestack[1:]
+                        else:
+                            del statestack[new_state:]
+                    elif new_state == '#push':
+                        statestack.append(statestack[-1])
+
+                    statetokens = tokendefs[statestack[-1]]
+
+                break
+        else:
+            if text[pos] == '\n':
+                statestack = ['root']
+                statetokens = tokendefs['root']
+                tokens.append((pos, Whitespace, '\n'))
+            else:
+                tokens.append((pos, Error, text[pos]))
+
+            pos += 1
+
+    return tokens, tuple(statestack), pos
@@ -1,3 +1,7 @@
-__all__ = ('JunosLexer',)
+__all__ = (
+    'JunosLexer',
+    'FastJunosLexer',
+)
 
 from .junos import JunosLexer
+from .fast import FastJunosLexer
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import re
+
+from string import ascii_letters, digits
+from typing import Optional
+from collections.abc import Iterator
+
+from ..common.regexps import IPV4_REGEXP, IPV6_REGEXP
+from .junos import JunosLexer
+
+from pygments.lexer import Lexer  # type: ignore
+from pygments.token import (  # type: ignore
+    Text,
+    Error,
+    Generic,
+    Whitespace,
+    Keyword,
+    Name,
+    Operator,
+    Number,
+    _TokenType,
+)
+
+
+WHITESPACES = frozenset(' \t\n\r\f\v')
+DIGITS = frozenset(digits)
+BANDWIDTH = frozenset('mkgMKG')
+ROOT_WORD = frozenset(ascii_letters + digits + '-_./*,$:')
+STAGER_WORD = frozenset(ascii_letters + digits + '-_./+=*:^&$,')
+# Comments, annotations, quoted text, and square blocks are left to the regular lexer.
+UNSUPPORTED = ('"', "'", '#', '[', ']', '/*')
+
+IPV4 = re.compile(IPV4_REGEXP, re.IGNORECASE)
+IPV6 = re.compile(f'(?:{IPV6_REGEXP})', re.IGNORECASE)
+WORD = re.compile(r'\S*')
+LINK = re.compile(r'[a-z0-9-_/]+\.(?:[a-z0-9-_/]+\.)*[a-z0-9-]+', re.IGNORECASE)
+
+Tokens = list[tuple[int, _TokenType, str]]
+
+
+class Unsupported(Exception):
+    pass
+
+
+class FastJunosLexer(Lexer):
+    """Lexer produces the same tokens as JunosLexer does for every line, but it classifies words with character
+    checks and uses the regular expressions only for addresses and links.
+
+    A line with a construction the lexer does not handle itself is passed to JunosLexer. Both lexers start
+    every line from the root state.
+    """
+
+    def __init__(self, **options) -> None:
+        super().__init__(**options)
+        self.fallback = JunosLexer(**options)
+
+    def get_tokens_unprocessed(self, text: str) -> Iterator[tuple[int, _TokenType, str]]:
+        start = 0
+        length = len(text)
+
+        while start < length:
+            end = text.find('\n', start) + 1 or length
+            line = text[start:end]
+
+            try:
+                tokens = self.lex_line(line)
+            except Unsupported:
+                tokens = list(self.fallback.get_tokens_unprocessed(line))
+
+            for pos, token_type, value in tokens:
+                yield start + pos, token_type, value
+
+            start = end
+
+    def lex_line(self, text: str) -> Tokens:
+        tokens: Tokens = []
+        stack = ['root']
+        unsupported = not text.isascii() or any(x in text for x in UNSUPPORTED)
+        pos = 0
+
+        while pos < len(text):
+            if stack[-1] == 'root':
+                pos = self.root(text, pos, tokens, stack, unsupported)
+            elif unsupported:
+                raise Unsupported
+            else:
+                pos = self.stager(text, pos, tokens, stack)
+
+        return tokens
+
+    @staticmethod
+    def no_match(text: str, pos: int, tokens: Tokens, stack: list[str]) -> int:
+        if text[pos] == '\n':
+            stack[:] = ['root']
+            tokens.append((pos, Whitespace, '\n'))
+        else:
+            tokens.append((pos, Error, text[pos]))
+
+        return pos + 1
+
+    @staticmethod
+    def word_end(text: str, pos: int) -> int:
+        return WORD.match(text, pos).end()  # type: ignore
+
+    def root(self, text: str, pos: int, tokens: Tokens, stack: list[str], unsupported: bool) -> int:
+        end = len(text)
+        q = pos
+
+        while q < end and text[q] in WHITESPACES:
+            q += 1
+
+        if q == end:
+            return self.no_match(text, pos, tokens, stack)
+
+        c = text[q]
+
+        if c == '#' or text.startswith('/*', q):
+            raise Unsupported
+
+        lead = [(pos, Whitespace, text[pos:q])] if q > pos else []
+
+        # DIFF/COMPARE
+        if c in '+-' and text.endswith('\n') and end - q >= 3:
+            token_type = Generic.Inserted if c == '+' else Generic.Deleted
+            tokens.extend(lead)
+            tokens.append((q, token_type, c))
+            tokens.append((q + 1, token_type, text[q + 1 :]))
+            return end
+
+        # INACTIVE AND PROTECTED
+        if c in 'iIpP':
+            for prefix, token_type in (('inactive: ', Name.Constant), ('protected: ', Whitespace)):
+                after = q + len(prefix)
+
+                if text[q:after].lower() == prefix and after < end and text[after] != ';':
+                    if text[after] in WHITESPACES:
+                        continue
+
+                    tokens.extend(lead)
+                    tokens.append((q, token_type, text[q:after]))
+                    stack.append(stack[-1])
+                    return after
+
+        # SPECIAL: DESCRIPTION
+        if c in 'dD' and text[q : q + 11].lower() == 'description' and text.endswith(';\n') and end - q >= 15:
+            if text[q + 11] in WHITESPACES:
+                tokens.extend(lead)
+                tokens.append((q, Keyword, text[q : q + 11]))
+                tokens.append((q + 11, Whitespace, text[q + 11]))
+                tokens.append((q + 12, Text, text[q + 12 : end - 2]))
+                tokens.append((end - 2, Operator.Word, ';\n'))
+                return end
+
+        # SPECIAL: DISABLE
+        if c in 'dD' and text[q:].lower() == 'disable;\n':
+            tokens.extend(lead)
+            tokens.append((q, Name.Constant, text[q : q + 7]))
+            tokens.append((q + 7, Operator.Word, ';\n'))
+            return end
+
+        if match := self.address(text, q):
+            tokens.extend(lead)
+            tokens.append((q, Whitespace, match.group()))
+            stack.append('stager')
+            return match.end()
+
+        if unsupported:
+            raise Unsupported
+
+        # NUMBER OR BANDWIDTH
+        if c in DIGITS:
+            j = q + 1
+
+            while j < end and text[j] in DIGITS:
+                j += 1
+
+            if j < end and text[j] in BANDWIDTH:
+                j += 1
+
+            if text[j:] == ';\n':
+                tokens.extend(lead)
+                tokens.append((q, Number, text[q:j]))
+                tokens.append((j, Operator.Word, ';\n'))
+                return end
+
+        # THE REST (REGULAR)
+        if c in ROOT_WORD:
+            j = q + 1
+
+            while j < end and text[j] in ROOT_WORD:
+                j += 1
+
+            tokens.extend(lead)
+            tokens.append((q, Keyword, text[q:j]))
+            stack.append('stager')
+            return j
+
+        # END OF A SECTION
+        if c == '}' and text[q + 1 :] == '\n':
+            tokens.extend(lead)
+            tokens.append((q, Operator.Word, '}'))
+            tokens.append((q + 1, Whitespace, '\n'))
+            return end
+
+        return self.no_match(text, pos, tokens, stack)
+
+    def stager(self, text: str, pos: int, tokens: Tokens, stack: list[str]) -> int:
+        end = len(text)
+        space = text[pos] in WHITESPACES
+        q = pos + 1 if space else pos
+
+        if q == end:
+            return self.no_match(text, pos, tokens, stack)
+
+        c = text[q]
+        lead = [(pos, Whitespace, text[pos])] if space else []
+
+        # ASTERISK SECTIONS
+        if space and c == '*':
+            tokens.extend(lead)
+            tokens.append((q, Keyword, '*'))
+            stack.append('stager')
+            return q + 1
+
+        if match := self.address(text, q):
+            tokens.extend(lead)
+            tokens.append((q, Whitespace, match.group()))
+            stack.append('stager')
+            return match.end()
+
+        # NUMBER OR BANDWIDTH
+        if c in DIGITS:
+            j = q + 1
+
+            while j < end and text[j] in DIGITS:
+                j += 1
+
+            if j + 1 < end and text[j] in BANDWIDTH and (text[j + 1] == ';' or text[j + 1] in WHITESPACES):
+                j += 1
+
+            if j < end and (text[j] == ';' or text[j] in WHITESPACES):
+                tokens.extend(lead)
+                tokens.append((q, Number, text[q:j]))
+                stack.append('stager')
+                return j
+
+        # LINKS, IFLS, RIBS, etc.
+        if '.' in text and '.' in text[q : self.word_end(text, q)] and (match := LINK.match(text, q)):
+            tokens.extend(lead)
+            tokens.append((q, Name.Tag, match.group()))
+            stack.append('stager')
+            return match.end()
+
+        # THE REST (REGULAR)
+        if c in STAGER_WORD:
+            j = q + 1
+
+            while j < end and text[j] in STAGER_WORD:
+                j += 1
+
+            tokens.extend(lead)
+            tokens.append((q, Keyword.Type, text[q:j]))
+            stack.append('stager')
+            return j
+
+        # BEGIN OF A SECTION OR END OF A STATEMENT
+        if c == '{' or c == ';':
+            tokens.extend(lead)
+            tokens.append((q, Operator.Word, c))
+
+            if len(stack) > 1:
+                stack.pop()
+
+            return q + 1
+
+        return self.no_match(text, pos, tokens, stack)
+
+    def address(self, text: str, pos: int) -> Optional[re.Match[str]]:
+        """Method matches an IPv4 or IPv6 address (or prefix) the same way the regular lexer does.
+
+        The expressions are tried only if the word can contain an address at all.
+        """
+        if text[pos] in DIGITS and (match := IPV4.match(text, pos)):
+            return match
+
+        if ':' in text and ':' in text[pos : self.word_end(text, pos)]:
+            return IPV6.match(text, pos)
+
+        return None
@@ -1,4 +1,6 @@
 from thymus.netloader.dispatcher import create
+from thymus.netloader.fleet import fetch_many, FetchResult
+from thymus.netloader.pool import ConnectionPool
 from thymus.netloader.exceptions import (
     TimeoutError,
     DisconnectError,
@@ -7,6 +9,9 @@ from thymus.netloader.exceptions import (
 
 __all__ = (
     'create',
+    'fetch_many',
+    'FetchResult',
+    'ConnectionPool',
     'TimeoutError',
     'DisconnectError',
     'KeyError',
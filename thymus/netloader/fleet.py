@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import os
+import asyncio
+
+from dataclasses import dataclass
+from typing import Any, TYPE_CHECKING
+from collections.abc import Iterable
+
+from thymus.netloader.dispatcher import create
+from thymus.netloader.exceptions import (
+    TimeoutError,
+    DisconnectError,
+)
+
+if TYPE_CHECKING:
+    import logging
+
+
+RETRIABLE_ERRORS = (TimeoutError, DisconnectError, asyncio.TimeoutError, OSError)
+
+
+@dataclass
+class FetchResult:
+    host: str
+    port: int
+    path: str
+    error: str
+    attempts: int
+
+
+def make_filename(target: dict[str, Any]) -> str:
+    """Function returns the name of the file for the config of the target.
+
+    It raises ValueError if the name given by the target is absolute or leads out of the folder, or if the target
+    has neither a filename nor a host.
+    """
+    if filename := target.get('filename'):
+        filename = str(filename)
+
+        parts = filename.replace('\\', '/').split('/')
+
+        if os.path.isabs(filename) or os.path.splitdrive(filename)[0] or '..' in parts:
+            raise ValueError(f'Filename "{filename}" must be relative to the folder.')
+
+        return filename
+
+    if not (host := target.get('host')):
+        raise ValueError('Target must have a host or a filename.')
+
+    host = str(host).replace(':', '_')
+
+    if port := target.get('port'):
+        return f'{host}_{port}.conf'
+
+    return f'{host}.conf'
+
+
+def save_config(path: str, data: str, encoding: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)  # the filename of a target may have subfolders
+    temp_path = path + '.part'
+
+    with open(temp_path, 'w', encoding=encoding) as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, path)
+
+
+async def fetch_one(
+    target: dict[str, Any],
+    *,
+    folder: str,
+    logger: logging.Logger,
+    semaphore: asyncio.Semaphore,
+    timeout: float,
+    retries: int,
+    retry_delay: float,
+    encoding: str,
+) -> FetchResult:
+    connection_data = {k: v for k, v in target.items() if k != 'filename'}
+    result = FetchResult(host=target.get('host', ''), port=target.get('port', -1), path='', error='', attempts=0)
+
+    async def fetch() -> str:
+        # create() eats the device type, so every attempt needs its own copy of the data
+        async with create(**connection_data, logger=logger) as connection:
+            return await connection.fetch_config()
+
+    try:
+        path = os.path.join(folder, make_filename(target))
+    except ValueError as error:
+        result.error = str(error)
+        logger.error(f'Fetch failed for {result.host}: {result.error}')
+        return result
+
+    while True:
+        result.attempts += 1
+
+        async with semaphore:
+            try:
+                output = await asyncio.wait_for(fetch(), timeout)
+                break
+            except RETRIABLE_ERRORS as error:
+                result.error = str(error) or f'Timeout error for host "{result.host}".'
+            except Exception as error:
+                result.error = str(error)
+                logger.error(f'Fetch failed for {result.host}: {result.error}')
+                return result
+
+        if result.attempts > retries:
+            logger.error(f'Fetch failed for {result.host}: {result.error}')
+            return result
+
+        logger.warning(f'Fetch attempt #{result.attempts} failed for {result.host}: {result.error}')
+        # the session slot is free during the delay, so the other hosts are not held up by this one
+        await asyncio.sleep(retry_delay * result.attempts)
+
+    if not output:
+        result.error = 'Remote response was empty.'
+        return result
+
+    # a local write error is not retried, the device would be fetched again for nothing
+    try:
+        await asyncio.to_thread(save_config, path, output + '\n', encoding)
+    except OSError as error:
+        result.error = f'Config cannot be saved to "{path}": {error}.'
+        logger.error(f'Fetch failed for {result.host}: {result.error}')
+        return result
+
+    result.path = path
+    result.error = ''
+
+    logger.info(f'Config for {result.host} saved to "{path}".')
+    return result
+
+
+async def fetch_many(
+    targets: Iterable[dict[str, Any]],
+    *,
+    folder: str,
+    logger: logging.Logger,
+    concurrency: int = 16,
+    timeout: float = 120.0,
+    retries: int = 2,
+    retry_delay: float = 1.0,
+    encoding: str = 'utf-8',
+) -> list[FetchResult]:
+    """Function fetches configs from many devices concurrently, no more than `concurrency` sessions at a time.
+
+    Every target is a dict with the arguments for `create` (e.g., device_type, host, username, password) and
+    an optional "filename". Each config is written to the folder as soon as it arrives. The `timeout` limits
+    the whole session with one host, and a failed session is retried `retries` times on network errors.
+
+    Results are returned in the order of the targets.
+    """
+    if concurrency < 1:
+        raise ValueError('Concurrency must be positive.')
+
+    if retries < 0:
+        raise ValueError('Number of retries cannot be negative.')
+
+    os.makedirs(folder, exist_ok=True)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = [
+        fetch_one(
+            target,
+            folder=folder,
+            logger=logger,
+            semaphore=semaphore,
+            timeout=timeout,
+            retries=retries,
+            retry_delay=retry_delay,
+            encoding=encoding,
+        )
+        for target in targets
+    ]
+
+    return await asyncio.gather(*tasks)
@@ -5,8 +5,10 @@ import asyncssh
 import telnetlib3  # type: ignore
 import re
 import os
+import hashlib
 
-from typing import Literal, Optional, Sequence, TYPE_CHECKING
+from typing import Literal, Optional, Sequence, Union, TYPE_CHECKING
+from collections.abc import AsyncIterator
 from abc import ABC, abstractmethod
 
 from thymus.netloader.exceptions import (
@@ -19,9 +21,56 @@ if TYPE_CHECKING:
     import logging
 
 
+# Parsed keys and certificates are shared by all the connections of the process.
+# The key is a path with a digest of the passphrase, the value is the mtime and the size of the file with its parsed
+# content.
+_keys_cache: dict[tuple[str, str], tuple[int, int, Union[asyncssh.SSHKey, asyncssh.SSHCertificate, Exception]]] = {}
+
+
+def match_key_type(filename: str) -> str:
+    name = filename.lower()
+    if '.pub' in name:
+        return ''
+    for ktype, condition in asyncssh.public_key._DEFAULT_KEY_FILES:
+        if condition and ktype in name:
+            return ktype
+    return ''
+
+
+def read_key_or_cert(
+    path: str, passphrase: str
+) -> Optional[Union[asyncssh.SSHKey, asyncssh.SSHCertificate, Exception]]:
+    """Function returns a parsed key or certificate, or the error of a wrong passphrase. It returns None if the file
+    cannot be read (e.g., it was removed after the folder was listed).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    # the passphrase itself is not kept by the process
+    key = (path, hashlib.blake2b(passphrase.encode(), digest_size=16).hexdigest())
+    if key in _keys_cache:
+        mtime, size, data = _keys_cache[key]
+        if mtime == stat.st_mtime_ns and size == stat.st_size:
+            return data
+    try:
+        if '.cert' in os.path.basename(path).lower():
+            data = asyncssh.read_certificate(path)
+        else:
+            data = asyncssh.read_private_key(path, passphrase)
+    except OSError:
+        return None
+    except asyncssh.KeyEncryptionError as error:
+        # A wrong passphrase is remembered too, so the key derivation is not repeated for every connection.
+        data = error
+    _keys_cache[key] = (stat.st_mtime_ns, stat.st_size, data)
+    return data
+
+
 def read_keys_and_certs(passphrase: str = '', ignore_encrypted: bool = True) -> Sequence[asyncssh.SSHKeyPair]:
     """
     Replacement for asyncssh.load_default_keypairs(). This function covers a wider scope of filenames.
+    Files are parsed once per process and read again only when they change.
     """
     keys: list[asyncssh.SSHKey] = []
     certs: list[asyncssh.SSHCertificate] = []
@@ -33,21 +82,20 @@ def read_keys_and_certs(passphrase: str = '', ignore_encrypted: bool = True) ->
             continue
 
         for elem in os.listdir(path):
-            for ktype, condition in asyncssh.public_key._DEFAULT_KEY_FILES:
-                if not condition:
-                    continue
-
-                try:
-                    if ktype in elem.lower() and '.pub' not in elem.lower():
-                        if '.cert' in elem.lower():
-                            cert = asyncssh.read_certificate(os.path.join(path, elem))
-                            certs.append(cert)
-                        else:
-                            p_key = asyncssh.read_private_key(os.path.join(path, elem), passphrase)
-                            keys.append(p_key)
-                except asyncssh.KeyEncryptionError as error:
-                    if not ignore_encrypted:
-                        raise error
+            if not match_key_type(elem):
+                continue
+
+            data = read_key_or_cert(os.path.join(path, elem), passphrase)
+
+            if data is None:
+                continue
+            elif isinstance(data, Exception):
+                if not ignore_encrypted:
+                    raise data
+            elif isinstance(data, asyncssh.SSHCertificate):
+                certs.append(data)
+            else:
+                keys.append(data)
 
     return asyncssh.load_keypairs(
         keylist=keys, passphrase=passphrase, certlist=certs, ignore_encrypted=ignore_encrypted
@@ -70,12 +118,14 @@ class Base(ABC):
         '_buf_limit',
         '_base_prompt',
         '_base_pattern',
+        '_regexps',
     )
 
     _terminating_symbols = ['>', '#']
     _fetch_command = ''
     _no_paging_command = ''
     _pattern = ''
+    _tail_window = 256  # how many already received symbols are rescanned along with a new chunk
 
     @property
     def trailer(self) -> str:
@@ -146,6 +196,7 @@ class Base(ABC):
         self._buf_limit = 65535
         self._base_pattern = ''
         self._base_prompt = ''
+        self._regexps: dict[tuple[str, int], re.Pattern[str]] = {}
 
     def send_data(self, data: str = '', verbose: bool = True) -> None:
         if not self._stdin:
@@ -176,14 +227,71 @@ class Base(ABC):
             self._conn.connection_lost(None)
         self._logger.info(f'Disconnected from {self.trailer}.')
 
+    @property
+    def is_alive(self) -> bool:
+        if not self._conn or not self._stdout or self._stdout.at_eof():
+            return False
+        if type(self._conn) is asyncssh.SSHClientConnection:
+            return not self._conn.is_closed()
+        return True
+
+    async def probe(self) -> bool:
+        """Method checks that an idle session is still open and answers with the prompt."""
+        if not self.is_alive:
+            return False
+        try:
+            self.send_data()
+            await self._read_until_pattern()
+        except Exception as error:
+            self._logger.debug(f'Probe failed for {self.trailer}: {error}.')
+            return False
+        return True
+
     async def fetch_config(self) -> str:
+        return '\n'.join([line async for line in self.fetch_config_stream()])
+
+    async def fetch_config_stream(self) -> AsyncIterator[str]:
+        """Method yields the lines of the config while the device is still sending it.
+
+        The lines are the same as `fetch_config` returns: normalized, without the echoed command and the prompt.
+        Only the current incomplete line and the last complete one are held in memory.
+        """
         self._logger.debug(f'Fetching config for {self.trailer}.')
         self.send_data(type(self)._fetch_command)
-        output = await self._read_until_pattern()
-        output = self.normalize_lines(output)
-        output = self.strip_command(output)
-        output = self.strip_prompt(output, self._base_prompt)
-        return output
+        backspace_char = '\x08'
+        rest = ''  # trailing line breaks are kept until the next chunk, they may be a part of a longer sequence
+        partial = ''  # a normalized line without its end yet
+        last: Optional[str] = None  # a complete line that may still turn out to be the prompt
+        is_command = True
+        async for chunk in self._read_chunks():
+            data = rest + chunk
+            size = len(data.rstrip('\r\n'))
+            rest = data[size:]
+            if not size:
+                continue
+            data = self.normalize_lines(data[:size])
+            if backspace_char in data:
+                data = data.replace(backspace_char, '')
+            lines = (partial + data).split('\n')
+            partial = lines.pop()
+            for line in lines:
+                for elem in (line + '\n').splitlines():
+                    if is_command:
+                        is_command = False
+                        continue
+                    if last is not None:
+                        yield last
+                    last = elem
+        lines = (partial + self.normalize_lines(rest)).splitlines()
+        for elem in lines:
+            if is_command:
+                is_command = False
+                continue
+            if last is not None:
+                yield last
+            last = elem
+        if last is not None and self._base_prompt not in last:
+            yield last
 
     async def __aenter__(self) -> Base:
         await self.connect()
@@ -193,26 +301,48 @@ class Base(ABC):
         await self.disconnect()
 
     async def _read_until_pattern(self, pattern: str = '', re_flags: int = 0, verbose: bool = False) -> str:
+        return ''.join([chunk async for chunk in self._read_chunks(pattern, re_flags, verbose)])
+
+    async def _read_chunks(self, pattern: str = '', re_flags: int = 0, verbose: bool = False) -> AsyncIterator[str]:
+        """Method yields the data as it arrives until the pattern is found. The last chunk contains the match."""
         if not self._stdout:
             raise ValueError(f'Reading channel is not available for {self.trailer}.')
         if not pattern:
             pattern = self._base_pattern
-        data = ''
+        regexp = self._compile(pattern, re_flags)
+        # The base prompt is looked up only along with the base pattern.
+        prompt_regexp = self._compile(self._base_prompt, re_flags) if pattern == self._base_pattern else None
+        # A pattern anchored to the end can only match within the tail of the data.
+        is_anchored = pattern.endswith('$')
+        tail_window = type(self)._tail_window
+        prompt_found = False
+        tail = ''
         self._logger.debug(f'Reading until pattern: "{pattern}" ({self._base_pattern}) for {self.trailer}.')
         while True:
             fut = self._stdout.read(self._buf_limit)
             try:
-                data += await asyncio.wait_for(fut, self._timeout)
+                chunk = await asyncio.wait_for(fut, self._timeout)
             except asyncio.TimeoutError:
                 raise TimeoutError(self._host)
+            if not chunk:
+                raise DisconnectError(self._host, 0, 'Connection closed by the remote side.', self._protocol)
             if verbose:
-                self._logger.debug(f'Data: {repr(data)}.')
-            if pattern == self._base_pattern:
-                if re.search(pattern, data, re_flags) and re.search(self._base_prompt, data, re_flags):
-                    return data
-            else:
-                if re.search(pattern, data, re_flags):
-                    return data
+                self._logger.debug(f'Data: {repr(chunk)}.')
+            yield chunk
+            # Only the new chunk with a tail of the previous data is scanned, so the reading stays linear.
+            # The tail covers matches that are split between chunks.
+            window = tail + chunk
+            if prompt_regexp and not prompt_found:
+                prompt_found = bool(prompt_regexp.search(window))
+            tail = window[-tail_window:]
+            if regexp.search(tail if is_anchored else window) and (not prompt_regexp or prompt_found):
+                return
+
+    def _compile(self, pattern: str, re_flags: int = 0) -> re.Pattern[str]:
+        key = (pattern, re_flags)
+        if key not in self._regexps:
+            self._regexps[key] = re.compile(pattern, re_flags)
+        return self._regexps[key]
 
     async def _find_prompt(self) -> str:
         self._logger.debug(f'Finding prompt for {self.trailer}.')
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Optional, TYPE_CHECKING
+from collections.abc import AsyncIterator
+
+from thymus.netloader.dispatcher import create
+
+if TYPE_CHECKING:
+    import logging
+
+    from thymus.netloader.platforms import Base
+
+
+PoolKey = tuple[str, str, int, str, str, str]
+
+
+@dataclass
+class IdleConnection:
+    connection: Base
+    handle: asyncio.TimerHandle
+
+
+def make_key(connection_data: dict[str, Any]) -> PoolKey:
+    protocol = connection_data.get('protocol', 'ssh')
+    port = connection_data.get('port', -1)
+
+    if port == -1:
+        port = 22 if protocol == 'ssh' else 23
+
+    # Sessions must not be shared between different credentials, but the pool keeps only their digest.
+    secrets = '\0'.join(str(connection_data.get(k, '')) for k in ('password', 'passphrase', 'secret'))
+    digest = hashlib.blake2b(secrets.encode(), digest_size=16).hexdigest()
+
+    return (
+        connection_data.get('device_type', ''),
+        connection_data.get('host', ''),
+        port,
+        connection_data.get('username', ''),
+        protocol,
+        digest,
+    )
+
+
+class ConnectionPool:
+    """Class keeps authenticated sessions warm, so the next fetch from the same device skips the login,
+    the prompt discovery, and the paging setup.
+
+    Sessions are keyed by the device type, the host, the port, and the user. An idle session is closed after
+    `idle_timeout` seconds, zero turns the reuse off.
+    """
+
+    def __init__(self, *, logger: logging.Logger, idle_timeout: float = 300.0, max_idle: int = 2) -> None:
+        if idle_timeout < 0:
+            raise ValueError('Idle timeout cannot be negative.')
+
+        if max_idle < 1:
+            raise ValueError('Number of idle sessions must be positive.')
+
+        self._logger = logger
+        self._idle_timeout = idle_timeout
+        self._max_idle = max_idle
+        self._idle: dict[PoolKey, list[IdleConnection]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def idle_timeout(self) -> float:
+        return self._idle_timeout
+
+    @idle_timeout.setter
+    def idle_timeout(self, value: float) -> None:
+        if value < 0:
+            raise ValueError('Idle timeout cannot be negative.')
+
+        self._idle_timeout = value
+
+    def __len__(self) -> int:
+        return sum(len(x) for x in self._idle.values())
+
+    @asynccontextmanager
+    async def acquire(self, **kwargs) -> AsyncIterator[Base]:
+        """Method provides a connected session, it takes the arguments of `create`.
+
+        The session returns to the pool afterwards. If an error occurs inside the block, the session is closed.
+        """
+        key = make_key(kwargs)
+
+        if not (connection := await self._take(key)):
+            connection = create(**kwargs)
+
+            try:
+                await connection.connect()
+            except BaseException:
+                await self._disconnect(connection)
+                raise
+
+        try:
+            yield connection
+        except BaseException:
+            await self._disconnect(connection)
+            raise
+
+        await self._put(key, connection)
+
+    async def close(self) -> None:
+        entries = [entry for idle in self._idle.values() for entry in idle]
+        self._idle.clear()
+
+        for entry in entries:
+            entry.handle.cancel()
+
+        await asyncio.gather(*(self._disconnect(entry.connection) for entry in entries), *self._tasks)
+
+    async def _take(self, key: PoolKey) -> Optional[Base]:
+        while idle := self._idle.get(key):
+            entry = idle.pop()
+            entry.handle.cancel()
+
+            if not idle:
+                del self._idle[key]
+
+            if await entry.connection.probe():
+                self._logger.debug(f'Reusing the session with {entry.connection.trailer}.')
+                return entry.connection
+
+            await self._disconnect(entry.connection)
+
+        return None
+
+    async def _put(self, key: PoolKey, connection: Base) -> None:
+        idle = self._idle.get(key, [])
+
+        if not self._idle_timeout or len(idle) >= self._max_idle or not connection.is_alive:
+            await self._disconnect(connection)
+            return
+
+        loop = asyncio.get_running_loop()
+        handle = loop.call_later(self._idle_timeout, self._expire, key, connection)
+        self._idle.setdefault(key, []).append(IdleConnection(connection, handle))
+
+    def _expire(self, key: PoolKey, connection: Base) -> None:
+        idle = self._idle.get(key, [])
+
+        for number, entry in enumerate(idle):
+            if entry.connection is connection:
+                del idle[number]
+                break
+        else:
+            return
+
+        if not idle:
+            del self._idle[key]
+
+        self._logger.debug(f'The idle session with {connection.trailer} has expired.')
+
+        task = asyncio.ensure_future(self._disconnect(connection))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _disconnect(self, connection: Base) -> None:
+        try:
+            await connection.disconnect()
+        except Exception as error:
+            self._logger.debug(f'Error while disconnecting from {connection.trailer}: {error}.')
@@ -49,11 +49,21 @@ class AppSettings:
             fixed_values=tuple(get_all_styles()),
         ),
         'night_mode': BoolSetting(False),
+        'fast_highlighting': BoolSetting(False, description='use a faster lexer if the platform has one'),
         'filename_max_length': IntSetting(256, val_range=(32, 1024)),
         'sidebar_max_length': IntSetting(64, val_range=(8, 1024)),
         'network_connection_timeout': IntSetting(15, val_range=(0, 1000), description='in seconds'),
-        'editor_frequency_factor': IntSetting(4, fixed_values=(2, 4, 8, 10), description='devided by ten'),
+        'network_idle_timeout': IntSetting(
+            300,
+            val_range=(0, 3600),
+            description='in seconds, zero turns the reuse of sessions off',
+        ),
         'editor_scale_factor': IntSetting(2, val_range=(1, 4), description='multiplied by the current height'),
+        'editor_window_size': IntSetting(
+            5000,
+            val_range=(0, 1000000),
+            description='in lines, zero loads a whole section at once',
+        ),
         'save_on_commit': BoolSetting(False),
     }
     platforms: dict[str, Platform] = {}
@@ -41,6 +41,7 @@ class Platform(ABC):
             'alias_sub_command_count': StrSetting('count', max_length=8, empty=False, pass_through=True),
             'alias_sub_command_inactive': StrSetting('inactive', max_length=8, empty=False, pass_through=True),
             'alias_sub_command_reveal': StrSetting('reveal', max_length=8, empty=False, pass_through=True),
+            'alias_sub_command_quiet': StrSetting('quiet', max_length=8, empty=False, pass_through=True),
         }
         self.path = path
         if load:
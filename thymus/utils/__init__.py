@@ -1,8 +1,14 @@
-from thymus.utils.utils import find_common, rreplace, dot_notation_fix, get_spaces
+from thymus.utils.utils import find_common, rreplace, dot_notation_fix, get_spaces, get_regexp, find_increasing
+from thymus.utils.prefix_index import PrefixIndex
+from thymus.utils.lines import Lines
 
 __all__ = (
     'find_common',
     'rreplace',
     'dot_notation_fix',
     'get_spaces',
+    'get_regexp',
+    'find_increasing',
+    'PrefixIndex',
+    'Lines',
 )
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from itertools import chain
+from typing import overload
+from collections.abc import Iterable, Iterator, Sequence
+
+
+CHUNK_SIZE = 1024
+
+
+class Lines(Sequence[str]):
+    """Class is an immutable sequence of config lines stored in chunks.
+
+    A splice returns a new sequence that shares all the chunks outside of the replaced lines with the old one,
+    so every commit can keep a snapshot of the config that costs about as much as the commit itself.
+    """
+
+    __slots__ = (
+        '_chunks',
+        '_offsets',
+        '_length',
+    )
+
+    def __init__(self, lines: Iterable[str] = ()) -> None:
+        self._set_chunks(self._make_chunks(list(lines)))
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[str]: ...
+
+    def __getitem__(self, index: int | slice) -> str | list[str]:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+
+            if step != 1:
+                return list(self)[index]
+
+            return self._get_range(start, stop)
+
+        if index < 0:
+            index += self._length
+
+        if not 0 <= index < self._length:
+            raise IndexError('Lines index out of range.')
+
+        position = bisect_right(self._offsets, index) - 1
+
+        return self._chunks[position][index - self._offsets[position]]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[str]:
+        return chain.from_iterable(self._chunks)
+
+    def __repr__(self) -> str:
+        return f'Lines(length={self._length}, chunks={len(self._chunks)})'
+
+    def splice(self, begin: int, end: int, lines: Iterable[str]) -> Lines:
+        """Method returns a new sequence where the lines from `begin` to `end` are replaced with the new ones.
+        Only the chunks that contain the replaced lines are rebuilt, the others are shared.
+        """
+        begin = max(0, min(begin, self._length))
+        end = max(begin, min(end, self._length))
+
+        if not self._chunks:
+            return self._from_chunks(self._make_chunks(list(lines)))
+
+        first = bisect_right(self._offsets, begin) - 1
+        last = bisect_right(self._offsets, end - 1) - 1 if end > begin else first
+        head = self._offsets[first]
+
+        middle = list(chain.from_iterable(self._chunks[first : last + 1]))
+        middle[begin - head : end - head] = lines
+
+        return self._from_chunks(self._chunks[:first] + self._make_chunks(middle) + self._chunks[last + 1 :])
+
+    # PRIVATE METHODS
+
+    @classmethod
+    def _from_chunks(cls, chunks: tuple[tuple[str, ...], ...]) -> Lines:
+        lines = cls.__new__(cls)
+        lines._set_chunks(chunks)
+
+        return lines
+
+    @staticmethod
+    def _make_chunks(data: list[str]) -> tuple[tuple[str, ...], ...]:
+        return tuple(tuple(data[i : i + CHUNK_SIZE]) for i in range(0, len(data), CHUNK_SIZE))
+
+    def _set_chunks(self, chunks: tuple[tuple[str, ...], ...]) -> None:
+        offsets: list[int] = []
+        length = 0
+
+        for chunk in chunks:
+            offsets.append(length)
+            length += len(chunk)
+
+        self._chunks = chunks
+        self._offsets = offsets
+        self._length = length
+
+    def _get_range(self, start: int, stop: int) -> list[str]:
+        if start >= stop:
+            return []
+
+        result: list[str] = []
+        position = bisect_right(self._offsets, start) - 1
+
+        while start < stop:
+            chunk = self._chunks[position]
+            offset = self._offsets[position]
+            result.extend(chunk[start - offset : stop - offset])
+            start = offset + len(chunk)
+            position += 1
+
+        return result
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections.abc import Iterable
+
+
+class PrefixIndex:
+    """Class keeps normalized names of sibling nodes sorted, so an exact or a prefix lookup takes O(log n + k)
+    instead of a scan of all the siblings.
+
+    Lookups return positions of the names in the original order.
+    """
+
+    __slots__ = (
+        '_keys',
+        '_positions',
+        '_first',
+    )
+
+    def __init__(self, names: Iterable[str]) -> None:
+        pairs = sorted((name, position) for position, name in enumerate(names))
+        self._keys = [name for name, _ in pairs]
+        self._positions = [position for _, position in pairs]
+        self._first: dict[str, int] = {}
+
+        for name, position in pairs:
+            # the sorting keeps the first position of a duplicate name ahead of the others
+            self._first.setdefault(name, position)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def find(self, name: str) -> int:
+        """Method returns the position of the first name that is equal to the argument, or -1."""
+        return self._first.get(name, -1)
+
+    def starts_with(self, prefix: str) -> list[int]:
+        """Method returns the positions of all names that start with the prefix in the original order."""
+        result: list[int] = []
+        start = bisect_left(self._keys, prefix)
+
+        for number in range(start, len(self._keys)):
+            if not self._keys[number].startswith(prefix):
+                break
+
+            result.append(self._positions[number])
+
+        result.sort()
+
+        return result
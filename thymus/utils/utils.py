@@ -2,6 +2,16 @@ from __future__ import annotations
 
 import re
 
+from bisect import bisect_left
+from functools import lru_cache
+
+
+REGEXP_CACHE_SIZE = 256
+
+# The constant patterns are compiled once, the cache below is for the patterns from the user.
+DOT_NOTATION = re.compile(re.escape('([a-z][-a-z0-9/]*)\\.(\\d+)'), re.IGNORECASE)
+SPACES = re.compile(r'^(\s+)')
+
 
 def find_common(elems: list[str]) -> str:
     result = ''
@@ -21,8 +31,7 @@ def rreplace(line: str, pattern: str, replacement: str, count: int = 1) -> str:
 
 def dot_notation_fix(value: str) -> str:
     value = value.lower()
-    pattern = '([a-z][-a-z0-9/]*)\.(\d+)'
-    if re_match := re.search(re.escape(pattern), value, re.IGNORECASE):
+    if re_match := DOT_NOTATION.search(value):
         ifd = re_match.group(1)
         ifl = re_match.group(2)
         value = value.replace(ifd + '.' + ifl, ifd + ' unit ' + ifl)
@@ -30,6 +39,45 @@ def dot_notation_fix(value: str) -> str:
 
 
 def get_spaces(line: str) -> int:
-    if m := re.search(r'^(\s+)', line):
+    if m := SPACES.search(line):
         return len(m.group(1))
     return 0
+
+
+@lru_cache(maxsize=REGEXP_CACHE_SIZE)
+def get_regexp(pattern: str, flags: int = 0) -> re.Pattern[str]:
+    """Function returns a compiled regular expression. The last patterns are cached, so the mods do not compile
+    a pattern for every line and do not pay for the lookup in the cache of the re module either.
+
+    It raises re.error if the pattern is incorrect.
+    """
+    return re.compile(pattern, flags)
+
+
+def find_increasing(values: list[int]) -> set[int]:
+    """Function returns the positions of a longest strictly increasing subsequence of the values in O(n log n)."""
+    tails: list[int] = []  # the smallest last value of a subsequence of every length
+    ends: list[int] = []  # the position of that value
+    parents = [-1] * len(values)
+
+    for position, value in enumerate(values):
+        length = bisect_left(tails, value)
+
+        if length:
+            parents[position] = ends[length - 1]
+
+        if length == len(tails):
+            tails.append(value)
+            ends.append(position)
+        else:
+            tails[length] = value
+            ends[length] = position
+
+    result: set[int] = set()
+    position = ends[-1] if ends else -1
+
+    while position != -1:
+        result.add(position)
+        position = parents[position]
+
+    return result
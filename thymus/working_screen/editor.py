@@ -1,12 +1,12 @@
 from __future__ import annotations
 
 import re
-import os
+import zlib
 import msgpack  # type: ignore
 
 from dataclasses import dataclass
 from typing import Optional, cast
-from collections.abc import Generator, Iterable, Iterator
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
 
 from textual import on, work
 from textual.widgets import TextArea
@@ -16,7 +16,19 @@ from textual.reactive import var, reactive
 from textual.worker import Worker, get_current_worker
 from textual.message import Message
 
-from thymus.utils import get_spaces
+from thymus.utils import Lines, get_spaces
+from thymus.working_screen.pacer import Pacer
+from thymus.working_screen.history import (
+    Delta,
+    HistoryFile,
+    get_digest,
+    pack_lines,
+    unpack_lines,
+    unpack_edit,
+)
+
+
+CHECKPOINT_INTERVAL = 32  # in commits
 
 
 class StopRollingBack(Exception): ...
@@ -29,6 +41,7 @@ class Editor(TextArea):
     @dataclass
     class NewBatch(Message):
         batch: tuple[str, int, Optional[int]]
+        pacer: Pacer
 
     @dataclass
     class LoadComplete(Message):
@@ -36,20 +49,30 @@ class Editor(TextArea):
 
     virtual_path = var('')
     lines_count = reactive(0)
+    rate = reactive(0)
 
     @property
     def last_context_id(self) -> int:
         return len(self.commit_history) - 1
 
-    def __init__(self, frequency: int, *args, **kwargs) -> None:
+    def __init__(self, *args, **kwargs) -> None:
         self._shadow_history: dict[int, tuple[str, list[Edit]]] = {}
         self._shadow_history[0] = ('', [])
         self.commit_history: dict[int, tuple[str, list[Edit]]] = {}
         self.commit_history[0] = ('', [])  # default commit, must always exist
         self.change_log: list[Edit] = []
+        self.deltas: dict[int, Delta] = {}
+        self.checkpoints: dict[int, bytes] = {}  # packed contents of some commits that are not saved yet
+        self.digest = b''  # of the content of the last saved commit
+        self.history_file: Optional[HistoryFile] = None
         self.drawing_thread: Optional[Worker] = None
-        self.frequency = frequency / 10
+        self.pacer: Optional[Pacer] = None
         self.min_indent: Optional[int] = None
+        self.source: Sequence[str] = []
+        self.window = (0, 0)  # the lines of the source that are loaded or being loaded now
+        self.source_end = 0
+        self.window_cb: Optional[Callable[[int], int]] = None
+        self.batch_size = 0
 
         super().__init__(soft_wrap=False, tab_behavior='indent', *args, **kwargs)
 
@@ -68,7 +91,20 @@ class Editor(TextArea):
             self.change_log.extend(edits)
             self._redo_batch(edits)
 
-    def enter_edit(self, data: list[str], current_height: int) -> None:
+    @property
+    def feed_size(self) -> int:
+        begin, end = self.window
+        return end - begin
+
+    def enter_edit(
+        self, data: Sequence[str], begin: int, end: int, current_height: int, window_cb: Callable[[int], int]
+    ) -> None:
+        """Method starts editing the lines of the data from `begin` to `end`.
+
+        The section is not copied at once, it is loaded window by window: the next window is loaded only when
+        the cursor or the view reaches the end of the loaded ones. The callback returns where a window starting
+        from the line may end. A commit covers the loaded lines only.
+        """
         self.text = ''
         self.styles.display = 'block'
         self.lines_count = 0
@@ -77,8 +113,34 @@ class Editor(TextArea):
             self.drawing_thread.cancel()
 
         self.change_log = []
+        self.min_indent = None
+        self.source = data
+        self.window = (begin, begin)
+        self.source_end = end
+        self.window_cb = window_cb
+        self.batch_size = current_height
+        self.load_next_window()
+
+    def load_next_window(self) -> None:
+        begin, start = self.window
+
+        if self.loading or start >= self.source_end or not self.window_cb:
+            return
+
+        end = self.window_cb(start)
+        self.window = (begin, end)
         self.loading = True
-        self.drawing_thread = self.draw(data, current_height)
+        self.pacer = Pacer(self.batch_size)
+        self.drawing_thread = self.draw(self.source[start:end], self.pacer)
+
+    def is_window_exhausted(self) -> bool:
+        if self.window[1] >= self.source_end:
+            return False
+
+        height = self.size.height
+        rest = self.document.line_count - height
+
+        return self.cursor_location[0] >= rest or self.scroll_offset.y + height >= rest
 
     def exit_edit(self) -> None:
         if self.drawing_thread:
@@ -86,6 +148,11 @@ class Editor(TextArea):
             self.lines_count = 0
 
         self.styles.display = 'none'
+        self.pacer = None
+        self.source = []
+        self.window = (0, 0)
+        self.source_end = 0
+        self.window_cb = None
         self.change_log = []
         self.min_indent = None
         self.text = ''
@@ -163,7 +230,8 @@ class Editor(TextArea):
         if end <= 0:
             return
 
-        virtual_path, data = self.commit_history[end]
+        virtual_path, _ = self.commit_history[end]
+        data = self.get_edits(end)
 
         text = yield virtual_path
         yield ''  # to feed the send call with no data
@@ -183,40 +251,60 @@ class Editor(TextArea):
         for match_line in re.finditer(r'(?:[^\n]+)?\n', self.text):
             yield match_line.group()
 
-    def save(self, target: str) -> None:
+    def save(self, target: str, content: Lines) -> None:
+        """Method saves the commits to the history file of the target. The content is the one of the last commit.
+
+        Only the commits that are not in the file yet are appended to it. Along with the edits, the file keeps
+        a delta of every commit and the packed content of every CHECKPOINT_INTERVAL-th one, so any commit can
+        be restored without undoing all the later ones.
+        """
         if self.change_log:
             return
 
-        storage: dict = {}
-        target = target + '.history'
+        if not self.history_file:
+            self.history_file = HistoryFile(target + '.history')  # replaces a file of the older format
 
-        for index, edit_pair in self.commit_history.items():
-            virtual_path, edits = edit_pair
+        history = self.history_file
+        last_id = self.last_context_id
+        commits: dict[int, tuple[str, list[Edit], Delta]] = {}
 
-            storage[str(index)] = {}
-            storage[str(index)][virtual_path] = []
+        for commit_id in range(1, last_id + 1):
+            if commit_id not in history.commits:
+                virtual_path, edits = self.commit_history[commit_id]
+                commits[commit_id] = (virtual_path, edits, self.get_delta(commit_id))
 
-            for edit in edits:
-                assert edit._edit_result
-
-                container = {
-                    'x': edit.text,
-                    'f': edit.from_location,
-                    't': edit.to_location,
-                    'm': edit.maintain_selection_offset,
-                    'e': edit._edit_result.end_location,
-                    'r': edit._edit_result.replaced_text,
-                }
-                storage[str(index)][virtual_path].append(container)
-
-        with open(target, 'bw') as f:
-            f.write(msgpack.packb(storage))
-            f.flush()
-            os.fsync(f.fileno())
+        for commit_id in range(0, last_id, CHECKPOINT_INTERVAL):
+            if commit_id not in history.checkpoints and commit_id not in self.checkpoints:
+                self.checkpoints[commit_id] = pack_lines(self.get_version(commit_id, content))
+
+        checkpoints = {k: v for k, v in self.checkpoints.items() if k < last_id and k not in history.checkpoints}
+        self.digest = get_digest(content)
+
+        if commits or checkpoints or self.digest != history.digest or not history.size:
+            history.append(commits, checkpoints, self.digest)
+
+        self.checkpoints = {}  # they are in the file now
 
     def load(self, target: str) -> bool:
         target = target + '.history'
 
+        if history := HistoryFile.open(target):
+            # only the index is read, the records of the commits are read when they are needed
+            if sorted(history.commits) != list(range(1, len(history.commits) + 1)):
+                return False
+
+            self.history_file = history
+            self.digest = history.digest
+
+            for commit_id in sorted(history.commits):
+                self.commit_history[commit_id] = (history.commits[commit_id][2], [])
+
+            return self.last_context_id != 0
+
+        return self.load_legacy(target)
+
+    def load_legacy(self, target: str) -> bool:
+        """Method reads a history file of the older format, which is a single msgpack map."""
         try:
             with open(target, 'br') as f:
                 bytes_data = f.read()
@@ -224,6 +312,19 @@ class Editor(TextArea):
         except Exception:
             return False
 
+        # the oldest files have no snapshots, they are restored by undoing all the commits
+        try:
+            self.digest = history_data.pop('digest', b'')
+            self.checkpoints = {int(k): v for k, v in history_data.pop('checkpoints', {}).items()}
+            self.deltas = {
+                int(k): Delta(v['b'], v['e'], unpack_lines(v['o']), unpack_lines(v['n']))
+                for k, v in history_data.pop('deltas', {}).items()
+            }
+        except (ValueError, KeyError, TypeError, zlib.error):
+            self.digest = b''
+            self.checkpoints = {}
+            self.deltas = {}
+
         for index, data in history_data.items():
             data = cast(dict, data)
 
@@ -243,19 +344,7 @@ class Editor(TextArea):
 
                 for edit_data in edits:
                     try:
-                        f_tuple = (int(edit_data['f'][0]), int(edit_data['f'][1]))
-                        t_tuple = (int(edit_data['t'][0]), int(edit_data['t'][1]))
-                        e_tuple = (int(edit_data['e'][0]), int(edit_data['e'][1]))
-
-                        edit = Edit(
-                            text=edit_data['x'],
-                            from_location=f_tuple,
-                            to_location=t_tuple,
-                            maintain_selection_offset=edit_data['m'],
-                        )
-                        edit._edit_result = EditResult(e_tuple, edit_data['r'])
-
-                        store.append(edit)
+                        store.append(unpack_edit(edit_data))
                     except (ValueError, IndexError, KeyError):
                         break
 
@@ -267,45 +356,160 @@ class Editor(TextArea):
         return True
 
     def restore_history(self) -> None:
+        """Method brings back the commits after they were replayed.
+
+        The replay records new deltas of the commits, so the records in the history file are stale. They are
+        dropped from the index, and the next save writes all the commits and checkpoints again.
+        """
         self.commit_history = self._shadow_history
 
+        if self.history_file:
+            self.history_file.forget(-1)  # the checkpoint of the commit 0 is stale too
+
+    def record_delta(self, commit_id: int, begin: int, end: int, old: list[str], new: list[str]) -> None:
+        self.deltas[commit_id] = Delta(begin, end, old, new)
+
+    def get_delta(self, commit_id: int) -> Delta:
+        if commit_id not in self.deltas and self.history_file and commit_id in self.history_file.commits:
+            _, _, self.deltas[commit_id] = self.history_file.read_commit(commit_id)
+
+        return self.deltas[commit_id]
+
+    def get_edits(self, commit_id: int) -> list[Edit]:
+        virtual_path, edits = self.commit_history[commit_id]
+
+        if not edits and self.history_file and commit_id in self.history_file.commits:
+            _, edits, self.deltas[commit_id] = self.history_file.read_commit(commit_id)
+            self.commit_history[commit_id] = (virtual_path, edits)
+
+        return edits
+
+    def truncate(self, target_id: int) -> None:
+        """Method forgets all the commits after the target one."""
+        for commit_id in range(target_id + 1, len(self.commit_history)):
+            del self.commit_history[commit_id]
+            self.deltas.pop(commit_id, None)
+            self.checkpoints.pop(commit_id, None)
+
+        if self.history_file:
+            self.history_file.forget(target_id)
+
+    def has_snapshots(self, content: Iterable[str]) -> bool:
+        """Method checks whether any commit can be restored from the content of the last one."""
+        stored = self.history_file.commits if self.history_file else {}
+
+        if not self.digest or any(
+            x not in self.deltas and x not in stored for x in range(1, len(self.commit_history))
+        ):
+            return False
+
+        return self.digest == get_digest(content)
+
+    def get_version(self, commit_id: int, content: Lines) -> Lines:
+        """Method returns the content of the commit. It starts from the nearest checkpoint or the content of
+        the last commit and applies the deltas in between.
+        """
+        current_id = self.last_context_id
+        checkpoints = set(self.checkpoints)
+
+        if self.history_file:
+            checkpoints.update(self.history_file.checkpoints)
+
+        for checkpoint_id in checkpoints:
+            if abs(checkpoint_id - commit_id) < abs(current_id - commit_id):
+                current_id = checkpoint_id
+
+        if current_id in self.checkpoints:
+            content = Lines(unpack_lines(self.checkpoints[current_id]))
+        elif current_id != self.last_context_id and self.history_file:
+            content = Lines(self.history_file.read_checkpoint(current_id))
+
+        while current_id > commit_id:
+            content = self.get_delta(current_id).revert(content)
+            current_id -= 1
+
+        while current_id < commit_id:
+            current_id += 1
+            content = self.get_delta(current_id).apply(content)
+
+        return content
+
     @on(NewBatch)
     def on_new_batch(self, event: Editor.NewBatch) -> None:
+        if event.pacer is not self.pacer:
+            return  # a late batch of a cancelled load
+
         text, counter, min_indent = event.batch
-        self.text += text
-        self.lines_count += counter
+
+        with event.pacer.taking():
+            self.append(text)
+
         self.min_indent = min_indent
+        self.call_after_refresh(self.on_batch_drawn, event.pacer, counter)
+
+    @on(LoadComplete)
+    def on_load_complete(self, _) -> None:
+        if self.is_window_exhausted():
+            self.load_next_window()
+
+    def watch_selection(self) -> None:
+        if self.is_window_exhausted():
+            self.load_next_window()
+
+    def watch_scroll_y(self, old_value: float, new_value: float) -> None:
+        super().watch_scroll_y(old_value, new_value)
+
+        if self.is_window_exhausted():
+            self.load_next_window()
+
+    def append(self, text: str) -> None:
+        """Method adds the loaded lines to the end. They are not changes, so neither the change log nor the undo
+        history records them, and the cursor stays where it is.
+        """
+        end = self.document.end
+        edit = Edit(text, end, end, True)
+        selection = self.selection
+        old_gutter_width = self.gutter_width
+        result = edit.do(self)
+
+        if old_gutter_width != self.gutter_width:
+            self.wrapped_document.wrap(self.wrap_width, self.indent_width)
+        else:
+            self.wrapped_document.wrap_range(edit.top, edit.bottom, result.end_location)
 
-    @work(thread=True)
-    def draw(self, data: list[str], limit: int) -> None:
-        import time
+        self._refresh_size()
+        self.selection = selection
+
+    def on_batch_drawn(self, pacer: Pacer, lines: int) -> None:
+        self.lines_count += lines  # the worker reports it when the last batch is drawn
+        pacer.drawn(lines)
+        self.rate = pacer.rate
 
+    @work(thread=True)
+    def draw(self, data: Iterable[str], pacer: Pacer) -> None:
         def batch_producer() -> Iterator[tuple[str, int, Optional[int]]]:
-            batch = ''
-            counter = 0
-            min_indent = None
+            batch: list[str] = []
+            min_indent = self.min_indent
 
             for line in data:
-                batch += line
-                counter += 1
+                batch.append(line)
 
                 if min_indent is None:
                     min_indent = get_spaces(line)
                 else:
                     min_indent = min(min_indent, get_spaces(line))
 
-                if counter % limit == 0:
-                    yield batch, counter, min_indent
-                    batch = ''
-                    counter = 0
-            yield batch, counter, min_indent
+                if len(batch) >= pacer.size:
+                    yield ''.join(batch), len(batch), min_indent
+                    batch = []
+            yield ''.join(batch), len(batch), min_indent
 
         worker = get_current_worker()
         for batch in batch_producer():
-            if worker.is_cancelled:
+            if not pacer.wait(worker):
                 break
-            self.post_message(Editor.NewBatch(batch))
-            time.sleep(self.frequency)
+            self.post_message(Editor.NewBatch(batch, pacer))
 
-        self.post_message(Editor.LoadComplete(self.lines_count))
+        if pacer.wait(worker):
+            self.post_message(Editor.LoadComplete(self.lines_count))
         self.loading = False
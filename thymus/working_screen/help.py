@@ -49,6 +49,8 @@ def help(template_path: str, platform_name: str, context: Context) -> Response:
                 body.append(v.format(CMD=context.alias_sub_command_diff))
             elif k == 'contains':
                 body.append(v.format(CMD=context.alias_sub_command_contains))
+            elif k == 'quiet':
+                body.append(v.format(CMD=context.alias_sub_command_quiet, DIFF=context.alias_sub_command_diff))
             elif k == 'reveal':
                 body.append(v)
 
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import os
+import zlib
+import struct
+import msgpack  # type: ignore
+
+from hashlib import blake2b
+from dataclasses import dataclass
+from typing import Optional
+from collections.abc import Iterable
+
+from textual.document._edit import Edit
+from textual.document._document import EditResult
+
+from thymus.utils import Lines
+
+
+MAGIC = b'THYH'
+VERSION = 1
+HEADER = MAGIC + struct.pack('<H', VERSION)
+TRAILER = struct.Struct('<Q4s')  # the offset of the index and the magic
+
+
+class HistoryFileError(Exception): ...
+
+
+@dataclass
+class Delta:
+    """Class describes a commit as lines of the content: the lines from `begin` to `end` of the previous content
+    (`old`) were replaced with the `new` ones. A delta can be applied in both directions.
+    """
+
+    begin: int
+    end: int
+    old: list[str]
+    new: list[str]
+
+    def apply(self, content: Lines) -> Lines:
+        return content.splice(self.begin, self.end, self.new)
+
+    def revert(self, content: Lines) -> Lines:
+        return content.splice(self.begin, self.begin + len(self.new), self.old)
+
+
+def pack_lines(lines: Iterable[str]) -> bytes:
+    return zlib.compress(''.join(lines).encode())
+
+
+def unpack_lines(data: bytes) -> list[str]:
+    return zlib.decompress(data).decode().splitlines(keepends=True)
+
+
+def get_digest(lines: Iterable[str]) -> bytes:
+    digest = blake2b(digest_size=16)
+
+    for line in lines:
+        digest.update(line.encode())
+
+    return digest.digest()
+
+
+def pack_edit(edit: Edit) -> dict:
+    assert edit._edit_result
+
+    return {
+        'x': edit.text,
+        'f': edit.from_location,
+        't': edit.to_location,
+        'm': edit.maintain_selection_offset,
+        'e': edit._edit_result.end_location,
+        'r': edit._edit_result.replaced_text,
+    }
+
+
+def unpack_edit(data: dict) -> Edit:
+    """Function restores an edit. It raises ValueError, IndexError, or KeyError if the data is broken."""
+    f_tuple = (int(data['f'][0]), int(data['f'][1]))
+    t_tuple = (int(data['t'][0]), int(data['t'][1]))
+    e_tuple = (int(data['e'][0]), int(data['e'][1]))
+
+    edit = Edit(text=data['x'], from_location=f_tuple, to_location=t_tuple, maintain_selection_offset=data['m'])
+    edit._edit_result = EditResult(e_tuple, data['r'])
+
+    return edit
+
+
+class HistoryFile:
+    """Class is an append-only file with the commits of a config.
+
+    The file starts with a header (magic and version). Every commit and every checkpoint is a separate zlib
+    compressed record, and the index of the records is written after them along with a trailer that points to
+    the index. A save appends only the new records and a new index, so any record can be read without the others.
+    Records of the rolled back commits and the old indexes are left as garbage until it outweighs the rest,
+    then the file is compacted.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.commits: dict[int, tuple[int, int, str]] = {}  # commit id: offset, size, virtual path
+        self.checkpoints: dict[int, tuple[int, int]] = {}  # commit id: offset, size
+        self.digest = b''  # of the content of the last commit
+        self.size = 0
+        self.garbage = 0
+
+    @classmethod
+    def open(cls, path: str) -> Optional[HistoryFile]:
+        """Method reads the index of the file. It returns None if the file is not of this format."""
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(HEADER)) != HEADER:
+                    return None
+
+                size = f.seek(0, os.SEEK_END)
+                f.seek(size - TRAILER.size)
+                offset, magic = TRAILER.unpack(f.read(TRAILER.size))
+
+                if magic != MAGIC or not len(HEADER) <= offset < size - TRAILER.size:
+                    return None
+
+                f.seek(offset)
+                index = msgpack.unpackb(f.read(size - TRAILER.size - offset))
+        except (OSError, ValueError, struct.error):
+            return None
+
+        history = cls(path)
+        history.size = size
+
+        try:
+            history.commits = {int(x[0]): (int(x[1]), int(x[2]), str(x[3])) for x in index['c']}
+            history.checkpoints = {int(x[0]): (int(x[1]), int(x[2])) for x in index['k']}
+            history.digest = bytes(index['d'])
+            history.garbage = int(index['g'])
+        except (ValueError, IndexError, KeyError, TypeError):
+            return None
+
+        return history
+
+    def read_commit(self, commit_id: int) -> tuple[str, list[Edit], Delta]:
+        offset, size, virtual_path = self.commits[commit_id]
+
+        try:
+            record = msgpack.unpackb(zlib.decompress(self._read(offset, size)))
+            edits = [unpack_edit(x) for x in record['x']]
+            delta = record['d']
+            delta = Delta(int(delta['b']), int(delta['e']), delta['o'], delta['n'])
+        except (OSError, ValueError, IndexError, KeyError, TypeError, zlib.error) as error:
+            raise HistoryFileError(f'Broken record of the commit {commit_id}: {error}.')
+
+        return virtual_path, edits, delta
+
+    def read_checkpoint(self, commit_id: int) -> list[str]:
+        try:
+            return unpack_lines(self._read(*self.checkpoints[commit_id]))
+        except (OSError, ValueError, zlib.error) as error:
+            raise HistoryFileError(f'Broken checkpoint of the commit {commit_id}: {error}.')
+
+    def forget(self, target_id: int) -> None:
+        """Method drops the records of all the commits after the target one from the index."""
+        for commit_id in [x for x in self.commits if x > target_id]:
+            self.garbage += self.commits.pop(commit_id)[1]
+
+        for commit_id in [x for x in self.checkpoints if x > target_id]:
+            self.garbage += self.checkpoints.pop(commit_id)[1]
+
+    def append(
+        self, commits: dict[int, tuple[str, list[Edit], Delta]], checkpoints: dict[int, bytes], digest: bytes
+    ) -> None:
+        """Method writes the records of the commits and checkpoints, and a new index, at the end of the file."""
+        if self.size and self.garbage > self.size // 2:
+            self._compact()
+
+        records: list[bytes] = []
+        offset = self.size or len(HEADER)
+
+        for commit_id, (virtual_path, edits, delta) in commits.items():
+            record = {
+                'x': [pack_edit(x) for x in edits],
+                'd': {'b': delta.begin, 'e': delta.end, 'o': delta.old, 'n': delta.new},
+            }
+            data = zlib.compress(msgpack.packb(record))
+
+            if commit_id in self.commits:
+                self.garbage += self.commits[commit_id][1]
+
+            self.commits[commit_id] = (offset, len(data), virtual_path)
+            records.append(data)
+            offset += len(data)
+
+        for commit_id, data in checkpoints.items():
+            if commit_id in self.checkpoints:
+                self.garbage += self.checkpoints[commit_id][1]
+
+            self.checkpoints[commit_id] = (offset, len(data))
+            records.append(data)
+            offset += len(data)
+
+        if self.size:
+            self.garbage += self.size - self._records_end()
+
+        self.digest = digest
+        index = msgpack.packb(
+            {
+                'c': [[k, *v] for k, v in self.commits.items()],
+                'k': [[k, *v] for k, v in self.checkpoints.items()],
+                'd': self.digest,
+                'g': self.garbage,
+            }
+        )
+
+        with open(self.path, 'r+b' if self.size else 'wb') as f:
+            if self.size:
+                f.seek(self.size)
+            else:
+                f.write(HEADER)
+
+            for record in records:
+                f.write(record)
+
+            f.write(index)
+            f.write(TRAILER.pack(offset, MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+            self.size = f.tell()
+
+    # PRIVATE METHODS
+
+    def _read(self, offset: int, size: int) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def _records_end(self) -> int:
+        # The index of the last save is garbage after the next one. It lies right before the trailer.
+        with open(self.path, 'rb') as f:
+            f.seek(self.size - TRAILER.size)
+            offset, _ = TRAILER.unpack(f.read(TRAILER.size))
+
+        return offset
+
+    def _compact(self) -> None:
+        """Method rewrites the file with the records from the index only."""
+        temp_path = self.path + '.tmp'
+        commits: dict[int, tuple[int, int, str]] = {}
+        checkpoints: dict[int, tuple[int, int]] = {}
+
+        with open(self.path, 'rb') as source, open(temp_path, 'wb') as target:
+            target.write(HEADER)
+
+            for commit_id, (offset, size, virtual_path) in sorted(self.commits.items()):
+                source.seek(offset)
+                commits[commit_id] = (target.tell(), size, virtual_path)
+                target.write(source.read(size))
+
+            for commit_id, (offset, size) in sorted(self.checkpoints.items()):
+                source.seek(offset)
+                checkpoints[commit_id] = (target.tell(), size)
+                target.write(source.read(size))
+
+            records_end = target.tell()
+            target.write(msgpack.packb({'c': [], 'k': [], 'd': self.digest, 'g': 0}))
+            target.write(TRAILER.pack(records_end, MAGIC))
+            target.flush()
+            os.fsync(target.fileno())
+            size = target.tell()
+
+        os.replace(temp_path, self.path)
+        self.commits = commits
+        self.checkpoints = checkpoints
+        self.size = size
+        self.garbage = 0
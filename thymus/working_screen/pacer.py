@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import time
+
+from threading import Event
+from contextlib import contextmanager
+from collections.abc import Iterator
+
+from textual.worker import Worker
+
+
+class Pacer:
+    """Class paces a drawing worker by the widget that consumes its batches.
+
+    The worker posts the next batch only when the previous one is drawn. The batch size doubles while the widget
+    takes a batch within the frame budget and halves when it takes twice as long, so a cheap widget gets a big
+    config in a few batches and an expensive one stays responsive. The refresh itself is not counted, its cost
+    does not depend on the size of a batch.
+    """
+
+    def __init__(self, size: int, *, budget: float = 1 / 30, limit: int = 65536) -> None:
+        self.size = self.minimum = max(size, 1)
+        self.budget = budget
+        self.limit = max(limit, self.minimum)
+        self.lines = 0
+        self.started = time.perf_counter()
+        self._spent = 0.0
+        self._drawn = Event()
+        self._drawn.set()
+
+    @property
+    def rate(self) -> int:
+        """Lines per second drawn since the start."""
+        if elapsed := time.perf_counter() - self.started:
+            return int(self.lines / elapsed)
+
+        return 0
+
+    def wait(self, worker: Worker) -> bool:
+        """Method blocks the worker until the previous batch is drawn. It returns False if the worker is cancelled."""
+        while not self._drawn.wait(0.1):
+            if worker.is_cancelled:
+                return False
+
+        if worker.is_cancelled:
+            return False
+
+        self._drawn.clear()
+
+        return True
+
+    @contextmanager
+    def taking(self) -> Iterator[None]:
+        """Method measures how long the widget takes a batch."""
+        started = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self._spent = time.perf_counter() - started
+
+    def drawn(self, lines: int) -> None:
+        """Method is called by the widget after the batch is drawn."""
+        self.lines += lines
+
+        if self._spent < self.budget:
+            self.size = min(self.size * 2, self.limit)
+        elif self._spent > self.budget * 2:
+            self.size = max(self.size // 2, self.minimum)
+
+        self._drawn.set()
@@ -21,6 +21,7 @@ class ScreenFooter(Widget):
     spaces = var(0)
     theme = var('')
     context_name = var('')
+    throughput = var(0)
 
     def compose(self) -> ComposeResult:
         with Horizontal(classes='key-container'):
@@ -38,6 +39,9 @@ class ScreenFooter(Widget):
         meta.append(f'Spaces: {self.spaces}')
         meta.append(f'Theme: {self.theme}')
 
+        if self.throughput:
+            meta.append(f'{self.throughput:,} lines/s')
+
         meta_line = ' • '.join(meta)
         self.query_one('.meta', Label).update(meta_line)
 
@@ -68,3 +72,6 @@ class ScreenFooter(Widget):
 
     def watch_spaces(self) -> None:
         self.update_meta()
+
+    def watch_throughput(self) -> None:
+        self.update_meta()
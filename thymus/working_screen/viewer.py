@@ -1,9 +1,50 @@
 from __future__ import annotations
 
-from textual.widgets import RichLog
+from typing import Any, Literal, Optional
 
+from rich.segment import Segment
+from rich.style import Style
+from rich.syntax import Syntax
+from rich.text import Text
+
+from textual.cache import LRUCache
+from textual.geometry import Size
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+from thymus.lexers import lex_lines
+
+
+class Viewer(ScrollView, can_focus=True):
+    """Widget shows a response without rendering all of it.
+
+    It keeps only the raw lines and renders the rows in the viewport when they are requested. The rows are
+    rendered in blocks, and only a few recent blocks are cached, so the memory used by the rendering does not
+    depend on the size of the response. The tokens of the lines are cached by the lexers separately.
+    """
+
+    DEFAULT_CSS = """
+    Viewer {
+        background: $surface;
+        color: $text;
+        overflow-y: scroll;
+    }
+    """
+
+    block_size = 128  # rows rendered at once
+    cache_size = 32  # blocks
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lines: list[str] = []
+        self.max_width = 0
+        self.mode: Literal['data', 'rich', 'system'] = 'data'
+        self.status: Literal['error', 'success'] = 'success'
+        self.lexer: Optional[Any] = None
+        self.theme = ''
+        self._syntax_theme = Syntax.get_theme('ansi_dark')
+        self._blocks: LRUCache[int, list[Strip]] = LRUCache(type(self).cache_size)
 
-class Viewer(RichLog):
     def enter_view(self) -> None:
         self.clear()
         self.styles.display = 'block'
@@ -11,3 +52,117 @@ class Viewer(RichLog):
     def exit_view(self) -> None:
         self.styles.display = 'none'
         self.clear()
+
+    def clear(self) -> None:
+        self.lines = []
+        self.max_width = 0
+        self._blocks.clear()
+        self.virtual_size = Size(0, 0)
+        self.scroll_to(0, 0, animate=False)
+        self.refresh()
+
+    def configure(
+        self,
+        *,
+        mode: Literal['data', 'rich', 'system'],
+        status: Literal['error', 'success'],
+        lexer: Optional[Any] = None,
+        theme: str = '',
+    ) -> None:
+        """Method sets how the lines are rendered. Already rendered rows are dropped if anything has changed."""
+        if (mode, status, type(lexer), theme) != (self.mode, self.status, type(self.lexer), self.theme):
+            self._blocks.clear()
+            self.refresh()
+
+        self.mode = mode
+        self.status = status
+        self.lexer = lexer
+        self.theme = theme
+        self._syntax_theme = Syntax.get_theme(theme or 'ansi_dark')
+
+    def extend(self, lines: list[str], max_width: int) -> None:
+        """Method adds new lines, only the rows that are visible now are rendered."""
+        if not lines:
+            return
+
+        start = len(self.lines)
+        last_block = (start - 1) // type(self).block_size if start else -1
+
+        self.lines.extend(lines)
+        self.max_width = max(self.max_width, max_width)
+
+        # the last block may be incomplete, so it must be lexed again
+        self._blocks.discard(last_block)
+
+        self.virtual_size = Size(self.max_width, len(self.lines))
+
+        if start < self.scroll_offset.y + self.size.height:
+            self.refresh()
+
+    def notify_style_update(self) -> None:
+        self._blocks.clear()
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.size.width
+
+        if index >= len(self.lines):
+            return Strip.blank(width, self.rich_style)
+
+        block_size = type(self).block_size
+        strips = self._get_block(index // block_size)
+        strip = strips[index % block_size]
+
+        return strip.crop_extend(scroll_x, scroll_x + width, self._get_background()).apply_style(self.rich_style)
+
+    def _get_background(self) -> Optional[Style]:
+        if self.mode == 'data' and self.theme:
+            return self._syntax_theme.get_background_style()
+
+        return None
+
+    def _get_block(self, number: int) -> list[Strip]:
+        if (strips := self._blocks.get(number)) is not None:
+            return strips
+
+        block_size = type(self).block_size
+        lines = self.lines[number * block_size : (number + 1) * block_size]
+        console = self.app.console
+
+        if self.mode == 'data':
+            texts = self._highlight(lines)
+        elif self.mode == 'rich':
+            texts = [Text.from_markup(line) for line in lines]
+        else:
+            style = 'green' if self.status == 'success' else 'red'
+            texts = [Text(line, style=style) for line in lines]
+
+        strips = []
+
+        for text in texts:
+            text.expand_tabs()
+            text.no_wrap = True
+            # the base style of a text is not a part of its rendered segments
+            segments = Segment.apply_style(text.render(console), console.get_style(text.style))
+            strips.append(Strip(Segment.simplify(segments)))
+
+        self._blocks[number] = strips
+
+        return strips
+
+    def _highlight(self, lines: list[str]) -> list[Text]:
+        theme = self._syntax_theme
+        base_style = theme.get_background_style()
+
+        if not self.lexer:
+            return [Text(line, style=base_style) for line in lines]
+
+        texts: list[Text] = []
+
+        for tokens in lex_lines(self.lexer, lines):
+            text = Text(style=base_style)
+            text.append_tokens((value, theme.get_style_for_token(token_type)) for token_type, value in tokens)
+            texts.append(text)
+
+        return texts
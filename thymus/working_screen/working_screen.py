@@ -3,9 +3,10 @@ from __future__ import annotations
 import os
 
 from pathlib import Path
+from functools import partial
 
-from typing import cast, Literal, Optional
-from collections.abc import Iterator
+from typing import cast, Any, Literal, Optional, TYPE_CHECKING
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 
 from textual import on, work
@@ -18,21 +19,25 @@ from textual.message import Message
 from textual.css.query import NoMatches
 
 from rich.text import Text
-from rich.syntax import Syntax
 
 from thymus.settings import AppSettings
 from thymus.contexts import Context
+from thymus.utils import Lines
 from thymus.responses import Response
 from thymus.modals import OpenScreenResult, OpenScreenNetworkData, ErrorScreen
 from thymus.working_screen.path_bar import PathBar
 from thymus.working_screen.editor import Editor, StopRollingBack, PreCommitCheckFailed
 from thymus.working_screen.command_line import CommandLine
 from thymus.working_screen.viewer import Viewer
+from thymus.working_screen.pacer import Pacer
 from thymus.working_screen.sidebar import Sidebar
 from thymus.working_screen.editor_overlay import EditorOverlay
 from thymus.working_screen.screen_footer import ScreenFooter
 from thymus.working_screen.help import help
 
+if TYPE_CHECKING:
+    from thymus.app import Thymus
+
 
 class WorkingScreen(Screen):
     BINDINGS = [
@@ -51,11 +56,16 @@ class WorkingScreen(Screen):
     spaces = var(0)
     theme = var('')
     context_name = var('')
+    throughput = var(0)
 
     @dataclass
     class FetchDone(Message):
         content: list[str]
 
+    @dataclass
+    class FetchProgress(Message):
+        lines: int
+
     @dataclass
     class FetchFailed(Message):
         uid: str
@@ -63,9 +73,10 @@ class WorkingScreen(Screen):
 
     @dataclass
     class NewBatch(Message):
-        batch: tuple[str, int]
+        batch: tuple[list[str], int]
         status: Literal['error', 'success']
         mode: Literal['data', 'rich', 'system']
+        pacer: Pacer
 
     @dataclass
     class Release(Message):
@@ -81,13 +92,13 @@ class WorkingScreen(Screen):
         super().__init__(name=name)
         self.settings = settings
         self.drawing_thread: Optional[Worker] = None
-        self.content: list[str] = []  # content is always a list of lines with the a new line escape for each line
+        self.pacer: Optional[Pacer] = None
+        self.content = Lines()  # the lines of the current context, every line ends with a new line escape
         self.contexts: list[Context] = []
         self.platform = data.platform
         self.platform_name = data.platform['short_name'].value
         self.encoding = data.encoding
         self.source = data.source
-        self.editor_feed_size = 0
         self.theme = settings['theme'].value
         self.loading = True
         self.fetch_content(data.target, device_type=data.platform['device_type'].value)
@@ -100,9 +111,7 @@ class WorkingScreen(Screen):
             with Vertical():
                 with Vertical():
                     yield Viewer()
-                    yield Editor(
-                        frequency=self.settings['editor_frequency_factor'].value, classes='disabled'
-                    ).data_bind(WorkingScreen.virtual_path)
+                    yield Editor(classes='disabled').data_bind(WorkingScreen.virtual_path)
 
                 with Vertical(id='working-screen-right-bottom-block'):
                     yield PathBar(id='working-screen-path').data_bind(
@@ -123,6 +132,7 @@ class WorkingScreen(Screen):
             WorkingScreen.spaces,
             WorkingScreen.theme,
             WorkingScreen.context_name,
+            WorkingScreen.throughput,
         )
 
     # EVENTS
@@ -140,28 +150,44 @@ class WorkingScreen(Screen):
         for context in self.contexts:
             context.release()
 
+    @on(FetchProgress)
+    def on_fetch_progress(self, event: FetchProgress) -> None:
+        try:
+            self.query_one(EditorOverlay).message = f'fetching • {event.lines} lines'
+        except NoMatches:
+            pass
+
     @on(FetchDone)
     def on_fetch_done(self, event: FetchDone) -> None:
-        self.content = event.content
+        self.content = Lines(event.content)
+
+        if self.source == 'remote':
+            self.query_one(EditorOverlay).message = ''
 
         if self.source == 'local':
             if (editor := self.query_one(Editor)).load(self.path) and (context_id := editor.last_context_id):
-                self.build_primary_context(context_id=context_id)
-                self.current_context = context_id
-
-                for cid in range(context_id - 1, -1, -1):
-                    context = self.contexts[-1]
-                    self.request_rollback(cid, cleanup=False, context=context)  # modifies self.content
-                    self.build_primary_context(context_id=cid)  # builds a new context & puts it at the end
+                if editor.has_snapshots(self.content):
+                    # the earlier contexts get their content from the nearest checkpoint when they are used
+                    for cid in range(context_id):
+                        self.build_primary_context(
+                            context_id=cid, loader=partial(editor.get_version, cid, self.content)
+                        )
+
+                    self.build_primary_context(context_id=context_id)
+                    self.current_context = context_id
+                else:
+                    self.build_primary_context(context_id=context_id)
+                    self.current_context = context_id
 
-                self.contexts.reverse()
-                self.content = open(self.path, encoding=self.encoding, errors='ignore').readlines()
-                self.set_active_context(self.contexts[context_id])
+                    for cid in range(context_id - 1, -1, -1):
+                        self.replay_rollback(self.contexts[-1])  # replaces self.content
+                        self.build_primary_context(context_id=cid)  # builds a new context & puts it at the end
 
-                for context in self.contexts:
-                    context._content = self.content
+                    self.contexts.reverse()
+                    self.content = self.contexts[context_id].content  # every context keeps its own snapshot
+                    editor.restore_history()
 
-                editor.restore_history()
+                self.set_active_context(self.contexts[context_id])
             else:
                 self.build_primary_context()
                 self.set_active_context(self.shortcut)
@@ -174,23 +200,29 @@ class WorkingScreen(Screen):
 
     @on(NewBatch)
     def on_new_batch(self, event: NewBatch) -> None:
+        if event.pacer is not self.pacer:
+            return  # a late batch of a cancelled response
+
         viewer = self.query_one(Viewer)
+        lines, max_width = event.batch
+
         if event.mode == 'data':
-            theme = self.settings['theme'].value
-            width = viewer.size.width - 2
-            text, code_width = event.batch
-            text = text.rstrip()
-            code_width = max(width, code_width)
-            lexer = self.shortcut.lexer()
-            syntax = Syntax(code=text, theme=theme, lexer=lexer, code_width=code_width)
-            viewer.write(syntax, scroll_end=False)
-        elif event.mode == 'rich':
-            viewer.markup = True
-            viewer.write(event.batch[0], scroll_end=False)
-            viewer.markup = False
+            lexer = self.shortcut.lexer
+
+            if self.settings['fast_highlighting'].value and self.shortcut.fast_lexer:
+                lexer = self.shortcut.fast_lexer
+
+            viewer.configure(mode=event.mode, status=event.status, lexer=lexer(), theme=self.settings['theme'].value)
         else:
-            color = 'green' if event.status == 'success' else 'red'
-            viewer.write(Text(event.batch[0], style=color), scroll_end=False)
+            viewer.configure(mode=event.mode, status=event.status)
+
+        with event.pacer.taking():
+            viewer.extend(lines, max_width)
+        self.call_after_refresh(self.on_batch_drawn, event.pacer, len(lines))
+
+    def on_batch_drawn(self, pacer: Pacer, lines: int) -> None:
+        pacer.drawn(lines)
+        self.throughput = pacer.rate
 
     @on(CommandLine.NewCommand)
     def on_new_command(self, event: CommandLine.NewCommand) -> None:
@@ -213,9 +245,9 @@ class WorkingScreen(Screen):
 
     @on(EditorOverlay.Stop)
     def on_loading_stop(self, _) -> None:
-        import time
-
-        time.sleep(self.settings['editor_frequency_factor'].value / 10)
+        if self.loading:
+            # the overlay shows the fetching progress, there is no editor to stop yet
+            return
 
         self.query_one(EditorOverlay).message = ''
         self.query_one(Editor).exit_edit()
@@ -224,6 +256,7 @@ class WorkingScreen(Screen):
     @on(Editor.LoadComplete)
     def on_editor_load_complete(self, _) -> None:
         self.query_one(EditorOverlay).message = ''
+        self.throughput = self.query_one(Editor).rate
 
     def on_quit_cb(self, result: bool) -> None:
         if result:
@@ -231,7 +264,8 @@ class WorkingScreen(Screen):
 
     def on_lines_count_change_cb(self, value: int) -> None:
         if value:
-            self.query_one(EditorOverlay).message = f'loading • {value}/{self.editor_feed_size}'
+            self.query_one(EditorOverlay).message = f'loading • {value}/{self.query_one(Editor).feed_size}'
+            self.throughput = self.query_one(Editor).rate
 
     # WATCHERS
 
@@ -249,10 +283,9 @@ class WorkingScreen(Screen):
                 sidebar.exit_view()
 
                 begin, end = self.shortcut.path_offset
-                data = self.content[begin:end]
+                height = self.size.height * self.settings['editor_scale_factor'].value
 
-                editor.enter_edit(data, self.size.height * self.settings['editor_scale_factor'].value)
-                self.editor_feed_size = len(data)
+                editor.enter_edit(self.content, begin, end, height, self.get_edit_window_end)
                 self.watch(editor, 'lines_count', self.on_lines_count_change_cb)
             elif self.mode == 'view':
                 editor.exit_edit()
@@ -278,7 +311,9 @@ class WorkingScreen(Screen):
 
     # ADDITIONAL ROUTINES
 
-    def configure_context(self, context: Context, *, exit_on_error=True) -> bool:
+    def configure_context(
+        self, context: Context, *, exit_on_error=True, build: Optional[Callable[[], None]] = None, defer=False
+    ) -> bool:
         for k, v in self.platform.settings.items():
             if not v.pass_through:
                 continue
@@ -290,8 +325,11 @@ class WorkingScreen(Screen):
                 err_msg += f'Value: "{v.value}". Exception: {error}'
                 self.settings.logger.error(str(error))
 
+        if defer:
+            return True  # the context is built when it is needed
+
         try:
-            context.build()
+            (build or context.build)()
         except Exception as error:
             if exit_on_error:
                 self.app.switch_screen(ErrorScreen(str(error)))
@@ -316,22 +354,34 @@ class WorkingScreen(Screen):
         self.spaces = context.spaces
         self.context_name = context.name
 
-    def build_primary_context(self, *, context_id=0) -> None:
+    def build_primary_context(self, *, context_id=0, loader: Optional[Callable[[], Lines]] = None) -> None:
         context = self.platform.link_context(  # type: ignore
             context_id=context_id,
             name='',
-            content=self.content,
+            content=loader or self.content,
             encoding=self.encoding,
             neighbors=self.contexts,
             saves_dir=self.settings.where_to_save(),
         )
-        self.configure_context(context)
+        self.configure_context(context, defer=bool(loader))
         self.contexts.append(context)
+
+        if not loader:
+            self.content = context.content
+
         self.loading = False
 
-    def add_context(self, commit: str) -> bool:
+    def get_edit_window_end(self, start: int) -> int:
+        _, end = self.shortcut.path_offset
+
+        return self.shortcut.get_window_end(start, end, self.settings['editor_window_size'].value)
+
+    def add_context(self, commit: str, window_end: Optional[int] = None) -> bool:
         begin, end = self.shortcut.path_offset
 
+        if window_end is not None:
+            end = min(end, window_end)  # only the loaded part of the section is replaced
+
         if len(self.content) < end:
             self.notify('Commit failed. Length mismatch.')
             return False
@@ -344,30 +394,29 @@ class WorkingScreen(Screen):
             self.notify(str(error), severity='error')
             return False
 
-        # We need no more this part of the content
-        del self.content[begin:end]
-
-        # Replace it with the data from the commit
-        for line in commit_data:
-            self.content.insert(begin, line)
-            begin += 1
-
-        # Create a new instance of the context
+        # Create a new instance of the context with the data from the commit instead of this part of the content,
+        # the previous contexts keep their own content
         next_context = self.platform.link_context(  # type: ignore
             context_id=self.current_context + 1,
             name='' if not self.shortcut.name else f'{self.shortcut.name}_commit_{self.current_context + 1}',
-            content=self.content,
+            content=self.content.splice(begin, end, commit_data),
             encoding=self.encoding,
             neighbors=self.contexts,
             saves_dir=self.settings.where_to_save(),
         )
 
-        # Try to configure & build it
-        if not self.configure_context(next_context, exit_on_error=False):
+        # Try to configure & build it, only the committed part is parsed again
+        build = partial(next_context.rebuild, self.shortcut, begin, end, len(commit_data))
+
+        if not self.configure_context(next_context, exit_on_error=False, build=build):
             return False
 
+        editor = self.query_one(Editor)
+        editor.record_delta(editor.last_context_id, begin, end, self.content[begin:end], commit_data)
+
         self.contexts.append(next_context)
         self.current_context += 1
+        self.content = next_context.content
 
         # Move path to the root
         self.virtual_path = next_context.path
@@ -388,7 +437,9 @@ class WorkingScreen(Screen):
                 if response.value:
                     if response.mode != 'system':
                         self.query_one(Viewer).clear()
-                        self.drawing_thread = self.draw(response)
+                        # the first screen is shown immediately, the rest goes as fast as the viewer draws it
+                        self.pacer = Pacer(self.size.height)
+                        self.drawing_thread = self.draw(response, self.pacer)
                     else:
                         self.notify(' '.join(response.value))
 
@@ -407,7 +458,7 @@ class WorkingScreen(Screen):
             return
 
         try:
-            self.query_one(Editor).save(self.path)
+            self.query_one(Editor).save(self.path, self.content)
 
             with open(self.path, 'w', encoding='utf-8') as f:
                 f.writelines(self.content)
@@ -432,7 +483,8 @@ class WorkingScreen(Screen):
         path = Path(__file__).resolve().parent.parent / templates_folder / help_filename
 
         if (help_info := help(str(path), self.platform_name, context)).value:
-            self.drawing_thread = self.draw(help_info)
+            self.pacer = Pacer(self.size.height)
+            self.drawing_thread = self.draw(help_info, self.pacer)
 
     def process_edit_commit_command(self) -> None:
         editor = self.query_one(Editor)
@@ -444,7 +496,7 @@ class WorkingScreen(Screen):
         try:
             commit_data = editor.commit()
 
-            if not self.add_context(commit_data):
+            if not self.add_context(commit_data, editor.window[1]):
                 editor.purge_last_commit()
 
             if self.settings['save_on_commit'].value:
@@ -490,33 +542,44 @@ class WorkingScreen(Screen):
                 else:
                     self.notify('Unknown command.', severity='error')
 
-    def request_rollback(self, rollback_id: int, *, cleanup=True, context: Optional[Context] = None) -> None:
-        if rollback_id < 0 or not self.current_context:
+    def request_rollback(self, rollback_id: int) -> None:
+        """Method drops all the contexts after the target one. Every context keeps its own content,
+        so nothing has to be undone.
+        """
+        if rollback_id < 0 or rollback_id >= self.current_context:
+            self.mode = 'view'
             return
 
+        target = self.contexts[rollback_id]
+
+        if target.is_built or self.configure_context(target, exit_on_error=False):
+            for context in self.contexts[rollback_id + 1 :]:
+                context.release()
+
+            del self.contexts[rollback_id + 1 :]
+            self.query_one(Editor).truncate(rollback_id)
+            self.current_context = rollback_id
+            self.content = target.content
+
+        self.mode = 'view'
+
+    def replay_rollback(self, context: Context) -> None:
+        """Method undoes the last commit of the editor's history, which built the context, and puts the previous
+        content to self.content. It is used for the history files that have no deltas of the commits.
+        """
         control = self.query_one(Editor)
         control.loading = True
-
-        iterations = control.rollback_count_to(rollback_id)
+        commit_id = control.last_context_id
 
         try:
-            for _ in range(iterations):
-                shortcut = context if context else self.shortcut
-                rollback_iter = control.rollback(cleanup)
-                virtual_path = next(rollback_iter)
-                begin, end, rollback_config = shortcut.get_rollback_config(virtual_path)
-                rollback_iter.send(rollback_config)
-
-                del self.content[begin:end]
-
-                if cleanup:
-                    context_to_release = self.contexts.pop(self.current_context)
-                    context_to_release.release()
-                    self.current_context -= 1
-
-                for line in rollback_iter:
-                    self.content.insert(begin, line)
-                    begin += 1
+            rollback_iter = control.rollback(cleanup=False)
+            virtual_path = next(rollback_iter)
+            begin, end, rollback_config = context.get_rollback_config(virtual_path)
+            rollback_iter.send(rollback_config)
+            lines = list(rollback_iter)
+
+            control.record_delta(commit_id, begin, begin + len(lines), lines, self.content[begin:end])
+            self.content = self.content.splice(begin, end, lines)
         except ValueError as error:
             self.settings.logger.error(str(error))
             self.notify(str(error), severity='error')
@@ -550,7 +613,7 @@ class WorkingScreen(Screen):
             except Exception as error:
                 self.post_message(WorkingScreen.FetchFailed(self.name, f'Unknown error at local open: {error}'))
         else:
-            from thymus.netloader import create, TimeoutError, DisconnectError, KeyError
+            from thymus.netloader import TimeoutError, DisconnectError, KeyError
 
             target = cast(OpenScreenNetworkData, target)
             self.path = f'{target.host}:{target.port}'
@@ -573,11 +636,19 @@ class WorkingScreen(Screen):
                 if target.secret:
                     connection_data['secret'] = target.secret
 
-                async with create(**connection_data, logger=self.settings.logger) as connect:
-                    output = await connect.fetch_config()
+                pool = cast('Thymus', self.app).get_connection_pool()
+
+                async with pool.acquire(**connection_data, logger=self.settings.logger) as connect:
+                    content: list[str] = []
+
+                    async for line in connect.fetch_config_stream():
+                        content.append(line + '\n')
 
-                    if output:
-                        self.post_message(WorkingScreen.FetchDone(output.splitlines(keepends=True)))
+                        if len(content) % 10000 == 0:
+                            self.post_message(WorkingScreen.FetchProgress(len(content)))
+
+                    if content:
+                        self.post_message(WorkingScreen.FetchDone(content))
                     else:
                         self.post_message(WorkingScreen.FetchFailed(self.name, 'Remote response was empty.'))
             except (KeyError, TimeoutError, DisconnectError) as error:
@@ -586,29 +657,34 @@ class WorkingScreen(Screen):
                 self.post_message(WorkingScreen.FetchFailed(self.name, f'Unknown error at remote open: {error}'))
 
     @work(thread=True)
-    def draw(self, data: Response) -> None:
-        import time
-
-        def batch_producer(limit: int) -> Iterator[tuple[str, int]]:
-            batch = ''
-            counter = 0
+    def draw(self, data: Response, pacer: Pacer) -> None:
+        def batch_producer() -> Iterator[tuple[list[str], int]]:
+            batch: list[str] = []
             max_width = 0
 
             for line in data.value:
-                batch += line + '\n'
-                counter += 1
-                max_width = max(len(line), max_width)
-
-                if counter % limit == 0:
-                    yield batch, max_width
-                    batch = ''
-                    counter = 0
+                for row, width in split_rows(line):
+                    batch.append(row)
+                    max_width = max(width, max_width)
+
+                    if len(batch) >= pacer.size:
+                        yield batch, max_width
+                        batch = []
             yield batch, max_width
 
+        def split_rows(line: Any) -> Iterator[tuple[str, int]]:
+            # the viewer works with rows, a value can also be an exception in the middle of the stream
+            if data.mode == 'rich':
+                # a markup can span several rows, so every row gets its own one
+                for text in Text.from_markup(str(line)).split('\n', allow_blank=True):
+                    yield text.markup, text.cell_len
+            else:
+                for row in str(line).split('\n'):
+                    yield row, len(row)
+
         worker = get_current_worker()
 
-        for batch in batch_producer(limit=self.size.height):
-            if worker.is_cancelled:
+        for batch in batch_producer():
+            if not pacer.wait(worker):
                 break
-            self.post_message(WorkingScreen.NewBatch(batch, data.status, data.mode))
-            time.sleep(0.2)
+            self.post_message(WorkingScreen.NewBatch(batch, data.status, data.mode, pacer))